@@ -0,0 +1,258 @@
+from pathlib import Path
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+import tracemalloc
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+import pairlist_generator as generator
+
+# Benchmark of pairlist_generator.py on synthetic data, runs fully offline.
+# Candles are written as hdf5 files in freqtrade's layout, then every stage of the generator
+# is timed on its own, then run again for its peak traced memory and, with -j, the peak resident
+# memory of the pool workers. Results are saved as json to be compared
+# between versions, e.g.
+#   python pairlist_benchmark.py --pairs 100 500 --days 1400 --timeframes 1d 1h
+#   python pairlist_benchmark.py --compare user_data/benchmarks/pairlist_benchmark_20211001_120000.json
+
+BENCHMARK_DIR = Path('user_data', 'benchmarks')
+START_DATE_STR = '20180101 00:00:00'
+INTERVAL_ARR = ['monthly', 'weekly', 'daily']
+ASSET_FILTER_PRICE_ARR = [0, 0.01, 0.02, 0.05, 0.15, 0.5]
+NUMBER_ASSETS_ARR = [30, 45, 60, 75, 90, 105, 120]
+
+
+def write_synthetic_data(datadir, number_pairs, days, timeframe, seed=0):
+    # Random walk candles, pairs get listed at random dates in the first half of the history
+    from freqtrade.misc import pair_to_filename
+
+    rng = np.random.default_rng(seed)
+    candle_delta = generator.parse_duration(timeframe)
+    start_date = datetime.strptime(START_DATE_STR, generator.DATE_TIME_FORMAT)
+    candles_per_day = int(pd.Timedelta(days=1) / candle_delta)
+    pairs = [f'SYN{i}/{generator.STAKE_CURRENCY}' for i in range(number_pairs)]
+
+    for pair in pairs:
+        listed_day = int(rng.integers(0, days // 2 + 1))
+        length = (days - listed_day) * candles_per_day
+        dates = pd.date_range(start_date + listed_day * candle_delta * candles_per_day, periods=length,
+                              freq=candle_delta, tz='UTC')
+        close = np.exp(np.cumsum(rng.normal(0, 0.02, length))) * rng.choice([0.005, 0.05, 1, 50])
+        spread = np.abs(rng.normal(0, 0.01, length))
+        candles = pd.DataFrame({
+            'date': dates,
+            'open': close,
+            'high': close * (1 + spread),
+            'low': close * (1 - spread),
+            'close': close,
+            'volume': rng.lognormal(10, 1, length),
+        })
+        # same as freqtrade's HDF5DataHandler.ohlcv_store
+        file_name = Path(datadir, f'{pair_to_filename(pair)}-{timeframe}.h5')
+        with pd.HDFStore(file_name, mode='a', complevel=9, complib='blosc') as store:
+            store.put(f'{pair}/ohlcv/tf_{timeframe}', candles, format='table', data_columns=['date'])
+
+    return pairs
+
+
+def get_workers_rss_mb():
+    # Resident memory of every child process (the pool workers), read from /proc, so Linux only
+    workers_rss_mb = []
+    for children_file in Path('/proc/self/task').glob('*/children'):
+        for pid in children_file.read_text().split():
+            try:
+                status = Path('/proc', pid, 'status').read_text()
+            except OSError:
+                continue
+            for line in status.splitlines():
+                if line.startswith('VmRSS:'):
+                    workers_rss_mb.append(int(line.split()[1]) / 1024)
+    return workers_rss_mb
+
+
+def sample_workers_memory(stop, peaks, interval=0.01):
+    # peaks: [biggest worker, all workers together] in MB, updated until stop is set
+    while not stop.wait(interval):
+        workers_rss_mb = get_workers_rss_mb()
+        if workers_rss_mb:
+            peaks[0] = max(peaks[0], max(workers_rss_mb))
+            peaks[1] = max(peaks[1], sum(workers_rss_mb))
+
+
+def measure(results, case, phase, function, *args, setup=None, **kwargs):
+    # Two passes, time first without tracing, then memory: tracemalloc slows every allocation down.
+    # setup runs before each pass, e.g. to clear a cache the phase should find cold.
+    if setup is not None:
+        setup()
+    started = time.perf_counter()
+    value = function(*args, **kwargs)
+    seconds = time.perf_counter() - started
+
+    if setup is not None:
+        setup()
+    workers_peaks = [0.0, 0.0]
+    stop = threading.Event()
+    sampler = threading.Thread(target=sample_workers_memory, args=(stop, workers_peaks), daemon=True)
+    if case['jobs'] > 1:
+        sampler.start()
+    tracemalloc.start()
+    try:
+        function(*args, **kwargs)
+        peak_mb = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    finally:
+        tracemalloc.stop()
+        stop.set()
+        if sampler.is_alive():
+            sampler.join()
+
+    result = {**case, 'phase': phase, 'seconds': round(seconds, 4), 'peak_mb': round(peak_mb, 2)}
+    line = (f"{case['pairs']:>5} pairs {case['days']:>5} days {case['timeframe']:>4}  "
+            f"{phase:<12} {seconds:9.3f}s {peak_mb:10.1f}MB")
+    if case['jobs'] > 1:
+        result['worker_peak_mb'] = round(workers_peaks[0], 2)
+        result['workers_total_mb'] = round(workers_peaks[1], 2)
+    if workers_peaks[1]:
+        line += f"  workers {workers_peaks[0]:8.1f}MB max {workers_peaks[1]:9.1f}MB total"
+    results.append(result)
+    print(line)
+
+    return value
+
+
+def load_pairs(pairs, datadir, timeframe, workers):
+    load_pair = partial(generator.load_pair_arrays, datadir=datadir, timeframe=timeframe)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(load_pair, pairs, chunksize=max(1, len(pairs) // (workers * 4))))
+    return list(map(load_pair, pairs))
+
+
+def rank_slices(slice_totals):
+    return [generator.select_top_pairs(totals, max(NUMBER_ASSETS_ARR)) for totals in slice_totals]
+
+
+def benchmark_case(results, datadir, number_pairs, days, timeframe, workers):
+    case = {'pairs': number_pairs, 'days': days, 'timeframe': timeframe, 'jobs': workers}
+    end_date_str = (datetime.strptime(START_DATE_STR, generator.DATE_TIME_FORMAT)
+                    + pd.Timedelta(days=days)).strftime(generator.DATE_TIME_FORMAT)
+    pairs = write_synthetic_data(datadir, number_pairs, days, timeframe)
+    date_slices = {
+        interval: generator.get_data_slices_dates(None, START_DATE_STR, end_date_str, interval)
+        for interval in INTERVAL_ARR
+    }
+
+    if timeframe[-1] in ('m', 'h'):
+        boundaries = generator.get_slice_boundaries(INTERVAL_ARR, START_DATE_STR, end_date_str)
+        volume_indexes, _ = measure(results, case, 'stream', generator.stream_volume_indexes, pairs, datadir,
+                                    timeframe, boundaries, ASSET_FILTER_PRICE_ARR, workers=workers)
+        volume_index = volume_indexes[0][1]
+    else:
+        pair_arrays = measure(results, case, 'load', load_pairs, pairs, datadir, timeframe, workers)
+        candles_matrix = measure(results, case, 'build', generator.build_candles_matrix, pair_arrays)
+        del pair_arrays
+        cache_dir = Path(datadir, f'.quote_volume_cache-{timeframe}')
+        measure(results, case, 'cache_cold', generator.load_candles_matrix, pairs, datadir, timeframe,
+                workers=workers, setup=lambda: shutil.rmtree(cache_dir, ignore_errors=True))
+        measure(results, case, 'cache_warm', generator.load_candles_matrix, pairs, datadir, timeframe,
+                workers=workers)
+        volume_index = measure(results, case, 'index', lambda: [
+            generator.process_candles_data(candles_matrix, asset_filter_price)
+            for asset_filter_price in ASSET_FILTER_PRICE_ARR
+        ])[0]
+
+    slice_totals = measure(results, case, 'slice', lambda: [
+        generator.get_slice_totals(volume_index, date_slices[interval]) for interval in INTERVAL_ARR
+    ])
+    measure(results, case, 'rank', lambda: [rank_slices(totals) for totals in slice_totals])
+    measure(results, case, 'sweep', lambda: list(generator.sweep_pairlists(
+        [(0, volume_index)], INTERVAL_ARR, NUMBER_ASSETS_ARR, START_DATE_STR, end_date_str)))
+
+
+def get_version():
+    try:
+        return subprocess.run(['git', 'describe', '--always', '--dirty'], capture_output=True, text=True,
+                              cwd=Path(__file__).parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, previous_file_name):
+    with open(previous_file_name) as f:
+        previous = json.load(f)
+
+    key = lambda result: (result['pairs'], result['days'], result['timeframe'], result['jobs'], result['phase'])
+    previous_results = {key(result): result for result in previous['results']}
+
+    print(f"\ncompared to {previous_file_name} ({previous.get('version')}), ratio > 1 means slower")
+    for result in results:
+        previous_result = previous_results.get(key(result))
+        if previous_result is None or not previous_result['seconds']:
+            continue
+        print(f"{result['pairs']:>5} pairs {result['days']:>5} days {result['timeframe']:>4}  {result['phase']:<12} "
+              f"time x{result['seconds'] / previous_result['seconds']:6.2f}  "
+              f"memory x{result['peak_mb'] / max(previous_result['peak_mb'], 0.01):6.2f}"
+              + (f"  workers memory x{result['worker_peak_mb'] / max(previous_result['worker_peak_mb'], 0.01):6.2f}"
+                 if 'worker_peak_mb' in result and 'worker_peak_mb' in previous_result else ''))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+
+    parser.add_argument("--pairs", help="numbers of synthetic pairs", type=int, nargs='+', default=[100, 500])
+    parser.add_argument("--days", help="lengths of synthetic history in days", type=int, nargs='+', default=[1400])
+    parser.add_argument("--timeframes", help="timeframes of synthetic candles", nargs='+', default=['1d'])
+    parser.add_argument("-j", "--jobs", help="number of worker processes used to load pairs data", type=int,
+                        default=1)
+    parser.add_argument("--compare", help="previous benchmark json to compare the results with")
+    parser.add_argument("--no-save", help="don't save the results", action="store_true")
+    args = parser.parse_args()
+
+    results = []
+
+    for timeframe in args.timeframes:
+        for days in args.days:
+            for number_pairs in args.pairs:
+                datadir = tempfile.mkdtemp(prefix='pairlist_benchmark_')
+                try:
+                    benchmark_case(results, datadir, number_pairs, days, timeframe, args.jobs)
+                finally:
+                    shutil.rmtree(datadir)
+
+    max_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    print(f"max resident memory {max_rss_mb:.1f}MB")
+
+    if args.compare:
+        compare(results, args.compare)
+
+    if not args.no_save:
+        report = {
+            'version': get_version(),
+            'created': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'cpus': os.cpu_count(),
+            'max_rss_mb': round(max_rss_mb, 1),
+            'results': results,
+        }
+        os.makedirs(BENCHMARK_DIR, exist_ok=True)
+        file_name = Path(BENCHMARK_DIR, f'pairlist_benchmark_{datetime.now().strftime("%Y%m%d_%H%M%S")}.json')
+        with open(file_name, 'w') as f:
+            json.dump(report, f, indent=4)
+        print(f"results saved to {file_name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,26 +1,27 @@
 from pathlib import Path
-from freqtrade.configuration import Configuration
-from freqtrade.data.history import load_pair_history
-from freqtrade.resolvers import ExchangeResolver
-from freqtrade.plugins.pairlistmanager import PairListManager
+import numpy as np
 import pandas as pd
 from datetime import datetime, timedelta
 import argparse
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
 from dateutil.relativedelta import *
 import json
 import os
+import shutil
+import sys
+import tempfile
+import time
+from typing import List, NamedTuple, Optional
 
 STAKE_CURRENCY = 'BUSD'
+EXCHANGE_NAME = 'binance'
+TIMEFRAME = '1d'
 
-config = Configuration.from_files([])
-config["dataformat_ohlcv"] = "hdf5"
-config["timeframe"] = "1d"
-config['exchange']['name'] = "binance"
-config['stake_currency'] = STAKE_CURRENCY
-config['exchange']['pair_whitelist'] = [
+PAIR_WHITELIST = [
     f'.*/{STAKE_CURRENCY}',
 ]
-config['exchange']['pair_blacklist'] = [
+PAIR_BLACKLIST = [
     '^(.*USD|USDC|AUD|BRZ|CAD|CHF|EUR|GBP|HKD|SGD|TRY|ZAR|TUSD)/.*',
     'PAX/.*',
     'DAI/.*',
@@ -30,24 +31,131 @@ config['exchange']['pair_blacklist'] = [
     ".*BEAR/USDT",
     ".*BULL/USDT"
 ]
-config['pairlists'] = [
-    {
-        "method": "StaticPairList",
-    },
+# Pairlist filters emulated before ranking, same parameters as in freqtrade's pairlists config.
+# Evaluated like freqtrade does when the pairlist is refreshed at the start of each slice, on the daily
+# candles of the lookback days before it. AgeFilter keeps a pair once it passed, for the whole history
+# here, where a bot only remembers it until restarted.
+PAIRLIST_FILTERS = [
+    # {"method": "AgeFilter", "min_days_listed": 10},
+    # {"method": "VolatilityFilter", "lookback_days": 10, "min_volatility": 0.05, "max_volatility": 0.5},
+    # {"method": "RangeStabilityFilter", "lookback_days": 10, "min_rate_of_change": 0.1, "max_rate_of_change": 0.99},
 ]
 
-exchange = ExchangeResolver.load_exchange(config['exchange']['name'], config, validate=False)
-pairlists = PairListManager(exchange, config)
-pairlists.refresh_pairlist()
-pairs = pairlists.whitelist
-data_location = Path(config['user_data_dir'], 'data', config['exchange']['name'])
+DATA_LOCATION = Path('user_data', 'data', EXCHANGE_NAME)
+PAIRS_CACHE_FILE = Path('user_data', 'pairlists', STAKE_CURRENCY, '.pairs_cache.json')
+# exchange markets change rarely, a resolved online whitelist is reused for that long
+PAIRS_CACHE_TTL = 24 * 60 * 60
+
+
+# freqtrade is only imported by the functions using it, so that --help starts without loading it
+def get_config():
+    from freqtrade.configuration import Configuration
+
+    config = Configuration.from_files([])
+    config["dataformat_ohlcv"] = "hdf5"
+    config["timeframe"] = TIMEFRAME
+    config['exchange']['name'] = EXCHANGE_NAME
+    config['stake_currency'] = STAKE_CURRENCY
+    config['exchange']['pair_whitelist'] = PAIR_WHITELIST
+    config['exchange']['pair_blacklist'] = PAIR_BLACKLIST
+    config['pairlists'] = [
+        {
+            "method": "StaticPairList",
+        },
+    ]
+
+    return config
+
+
+def resolve_pairs_online():
+    from freqtrade.resolvers import ExchangeResolver
+    from freqtrade.plugins.pairlistmanager import PairListManager
+
+    config = get_config()
+    exchange = ExchangeResolver.load_exchange(config['exchange']['name'], config, validate=False)
+    pairlists = PairListManager(exchange, config)
+    pairlists.refresh_pairlist()
+
+    return pairlists.whitelist
+
+
+def resolve_pairs_offline(datadir, timeframe):
+    # Pairs which have downloaded data, white and blacklist expanded the same way freqtrade does for markets
+    from freqtrade.plugins.pairlist.pairlist_helpers import expand_pairlist
+
+    suffix = f'-{timeframe}.h5'
+    available_pairs = sorted(
+        '/'.join(file_name.name[:-len(suffix)].rsplit('_', 1))
+        for file_name in Path(datadir).glob(f'*{suffix}')
+    )
+    blacklist = set(expand_pairlist(PAIR_BLACKLIST, available_pairs))
+
+    return [pair for pair in expand_pairlist(PAIR_WHITELIST, available_pairs) if pair not in blacklist]
+
+
+def resolve_pairs(datadir, timeframe, offline=False, refresh=False):
+    # Resolved whitelist is cached. Online it's kept for PAIRS_CACHE_TTL,
+    # offline until a data file is added or removed (data directory mtime changes).
+    cache_key = {
+        'exchange': EXCHANGE_NAME,
+        'timeframe': timeframe,
+        'whitelist': PAIR_WHITELIST,
+        'blacklist': PAIR_BLACKLIST,
+        'offline': offline,
+        'datadir_mtime': Path(datadir).stat().st_mtime_ns if offline and Path(datadir).is_dir() else None,
+    }
+
+    if not refresh and PAIRS_CACHE_FILE.is_file():
+        with open(PAIRS_CACHE_FILE) as f:
+            cached = json.load(f)
+        if cached['key'] == cache_key and (offline or time.time() - cached['resolved_at'] < PAIRS_CACHE_TTL):
+            return cached['pairs']
+
+    pairs = resolve_pairs_offline(datadir, timeframe) if offline else resolve_pairs_online()
+
+    os.makedirs(PAIRS_CACHE_FILE.parent, exist_ok=True)
+    with open(PAIRS_CACHE_FILE, 'w') as f:
+        json.dump({'key': cache_key, 'resolved_at': time.time(), 'pairs': pairs}, f)
+
+    return pairs
 
-print(f"found {str(len(pairs))} pairs on {config['exchange']['name']}")
 
 DATE_FORMAT = '%Y%m%d'
 DATE_TIME_FORMAT = '%Y%m%d %H:%M:%S'
 
+def parse_duration(duration):
+    # '12h', '7d', '2w' -> timedelta
+    units = {'m': 'minutes', 'h': 'hours', 'd': 'days', 'w': 'weeks'}
+    return timedelta(**{units[duration[-1]]: int(duration[:-1])})
+
+
+def get_rolling_slices_dates(start_date_str, end_date_str, window, step):
+    # VolumePairList emulation: the pairlist used from 'start' to 'end' is ranked on the trailing
+    # window before 'start' ('rank_start' to 'rank_end'), refreshed every step like the live bot does.
+    # Window totals come from the cumulative volume index, so overlapping windows cost nothing extra.
+    start_date = datetime.strptime(start_date_str, DATE_TIME_FORMAT)
+    end_date = datetime.strptime(end_date_str, DATE_TIME_FORMAT)
+
+    slices = []
+
+    while start_date < end_date:
+        slices.append({
+            'start': start_date,
+            'end': min(start_date + step, end_date),
+            'rank_start': start_date - window,
+            'rank_end': start_date,
+        })
+        start_date += step
+
+    return slices
+
+
 def get_data_slices_dates(df, start_date_str, end_date_str, interval):
+    if interval.startswith('rolling_'):
+        # rolling_<window>_<step>, e.g. rolling_7d_1d
+        _, window, step = interval.split('_')
+        return get_rolling_slices_dates(start_date_str, end_date_str, parse_duration(window), parse_duration(step))
+
     # df_start_date = df.date.min()
     # df_end_date = df.date.max()
 
@@ -97,61 +205,649 @@ def get_data_slices_dates(df, start_date_str, end_date_str, interval):
     return slices
 
 
-def process_candles_data(pairs, filter_price):
-    full_dataframe = pd.DataFrame()
+class CandlesMatrix(NamedTuple):
+    # Dense pair matrices aligned on one date index: rows are dates, columns are pairs
+    dates: np.ndarray
+    pairs: List[str]
+    close: np.ndarray
+    quote_volume: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
 
-    for pair in pairs:
 
+def load_pair_arrays(pair, datadir, timeframe, verbose=False):
+    # Runs in pool workers as well, so everything it needs comes in as arguments
+    # and only compact numpy arrays are sent back to the parent process
+    from freqtrade.data.history import load_pair_history
 
-        print(data_location)
-        print(config["timeframe"])
-        print(pair)
+    candles = load_pair_history(
+        datadir=datadir,
+        timeframe=timeframe,
+        pair=pair,
+        data_format="hdf5"
+    )
 
-        candles = load_pair_history(
-            datadir=data_location,
-            timeframe=config["timeframe"],
-            pair=pair,
-            data_format="hdf5"
-        )
+    if verbose:
+        print("Loaded " + str(len(candles)) + f" rows of data for {pair} from {datadir}")
+
+    if not len(candles):
+        return None
+
+    dates = candles['date'].dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+    close = candles['close'].to_numpy(dtype='float64')
+    quote_volume = candles['volume'].to_numpy(dtype='float64') * close
+    high = candles['high'].to_numpy(dtype='float64')
+    low = candles['low'].to_numpy(dtype='float64')
+
+    return pair, dates, close, quote_volume, high, low
+
+
+def build_candles_matrix(pair_arrays):
+    # Align every pair onto the union of all candle dates in a single pass.
+    # Chaining pd.merge per pair copies the whole frame each time and drops candles
+    # older than the first loaded pair, here the cost is linear in pairs x candles.
+    pair_arrays = [arrays for arrays in pair_arrays if arrays is not None]
+    pairs = [arrays[0] for arrays in pair_arrays]
+
+    if pair_arrays:
+        dates = np.unique(np.concatenate([arrays[1] for arrays in pair_arrays]))
+    else:
+        dates = np.array([], dtype='datetime64[ns]')
+
+    # close, quote_volume, high, low
+    matrices = [np.full((len(dates), len(pairs)), np.nan) for _ in CACHE_ARRAYS[1:]]
+
+    for column, (pair, pair_dates, *pair_values) in enumerate(pair_arrays):
+        rows = np.searchsorted(dates, pair_dates)
+        for matrix, values in zip(matrices, pair_values):
+            matrix[rows, column] = values
+
+    return CandlesMatrix(dates, pairs, *matrices)
+
+
+# Arrays returned by load_pair_arrays after the pair name, stored one after another for all pairs
+CACHE_ARRAYS = ['dates', 'close', 'quote_volume', 'high', 'low']
+CACHE_VERSION = 2
+
+
+def get_data_fingerprint(datadir, pair, timeframe):
+    # same file naming as freqtrade's hdf5 data handler
+    from freqtrade.misc import pair_to_filename
+
+    file_name = Path(datadir, f'{pair_to_filename(pair)}-{timeframe}.h5')
+    if not file_name.is_file():
+        return None
+    stat = file_name.stat()
+    return [stat.st_size, stat.st_mtime_ns]
+
+
+# Every save writes a complete version of the cache into its own directory, then swaps the 'current'
+# pointer file to it with one atomic rename. Concurrent runs (e.g. one per stake currency) never write to the
+# same files and readers always see the arrays and offsets of one version. Versions other than the current one
+# are removed once older than CACHE_STALE_SECONDS, so that a run still writing its version keeps it.
+CACHE_POINTER_FILE = 'current'
+CACHE_STALE_SECONDS = 60 * 60
+
+
+def load_quote_volume_cache(cache_dir, timeframe):
+    # Index of cached pairs plus memory mapped arrays, nothing is read until a pair is sliced out
+    try:
+        with open(Path(cache_dir, CACHE_POINTER_FILE)) as f:
+            version_dir = Path(cache_dir, f.read().strip())
+        with open(Path(version_dir, 'index.json')) as f:
+            index = json.load(f)
+        if index['version'] != CACHE_VERSION or index['timeframe'] != timeframe:
+            return {}, {}
+        arrays = {name: np.load(Path(version_dir, f'{name}.npy'), mmap_mode='r') for name in CACHE_ARRAYS}
+    except (OSError, ValueError, KeyError):
+        return {}, {}
+
+    return index['pairs'], arrays
+
+
+def save_quote_volume_cache(cache_dir, timeframe, cache_entries):
+    # cache_entries: {pair: (fingerprint, pair_arrays)}
+    os.makedirs(cache_dir, exist_ok=True)
+    version_dir = Path(tempfile.mkdtemp(prefix=f'{time.time_ns()}-', dir=cache_dir))
+
+    index_pairs = {}
+    offset = 0
+    for pair, (fingerprint, pair_arrays) in cache_entries.items():
+        length = 0 if pair_arrays is None else len(pair_arrays[1])
+        index_pairs[pair] = {'fingerprint': fingerprint, 'offset': offset, 'length': length}
+        offset += length
+
+    for position, name in enumerate(CACHE_ARRAYS, start=1):
+        array = np.concatenate([
+            pair_arrays[position] for _, pair_arrays in cache_entries.values() if pair_arrays is not None
+        ] or [np.array([], dtype='datetime64[ns]' if name == 'dates' else 'float64')])
+        np.save(Path(version_dir, f'{name}.npy'), array)
+
+    with open(Path(version_dir, 'index.json'), 'w') as f:
+        json.dump({'version': CACHE_VERSION, 'timeframe': timeframe, 'pairs': index_pairs}, f)
+
+    pointer_fd, pointer_file = tempfile.mkstemp(prefix=f'.{CACHE_POINTER_FILE}-', dir=cache_dir)
+    with os.fdopen(pointer_fd, 'w') as f:
+        f.write(version_dir.name)
+    os.replace(pointer_file, Path(cache_dir, CACHE_POINTER_FILE))
+
+    # arrays of removed versions that are still memory mapped stay readable until unmapped
+    for other_dir in Path(cache_dir).iterdir():
+        if other_dir.is_dir() and other_dir != version_dir:
+            try:
+                if time.time() - other_dir.stat().st_mtime > CACHE_STALE_SECONDS:
+                    shutil.rmtree(other_dir)
+            except OSError:
+                pass
+
+
+def load_candles_matrix(pairs, datadir, timeframe, workers=1, verbose=False, use_cache=True):
+    # Read every pair from disk only once per run. Close and quote volume are kept side by side
+    # so that each min price threshold can be applied to the in-memory matrix afterwards.
+    # Pairs whose data file did not change since the last run are taken from the on-disk cache.
+    cache_dir = Path(datadir, f'.quote_volume_cache-{timeframe}')
+    fingerprints = {pair: get_data_fingerprint(datadir, pair, timeframe) for pair in pairs}
+    cached_pairs, cached_arrays = load_quote_volume_cache(cache_dir, timeframe) if use_cache else ({}, {})
+
+    cache_entries = {}
+    for pair, entry in cached_pairs.items():
+        pair_arrays = None
+        if entry['length']:
+            cached_slice = slice(entry['offset'], entry['offset'] + entry['length'])
+            pair_arrays = (pair, *[cached_arrays[name][cached_slice] for name in CACHE_ARRAYS])
+        cache_entries[pair] = (entry['fingerprint'], pair_arrays)
+
+    stale_pairs = [
+        pair for pair in pairs
+        if pair not in cache_entries or cache_entries[pair][0] != fingerprints[pair]
+    ]
+
+    if verbose:
+        print(f"{len(pairs) - len(stale_pairs)} pairs taken from cache, loading {len(stale_pairs)} pairs")
+
+    load_pair = partial(load_pair_arrays, datadir=datadir, timeframe=timeframe, verbose=verbose)
+
+    if workers > 1 and len(stale_pairs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunksize = max(1, len(stale_pairs) // (workers * 4))
+            loaded = list(executor.map(load_pair, stale_pairs, chunksize=chunksize))
+    else:
+        loaded = list(map(load_pair, stale_pairs))
+
+    for pair, pair_arrays in zip(stale_pairs, loaded):
+        cache_entries[pair] = (fingerprints[pair], pair_arrays)
+
+    candles_matrix = build_candles_matrix(cache_entries[pair][1] for pair in pairs)
+
+    if use_cache and stale_pairs:
+        # entries of pairs not in this run are kept, other stake currencies share the data directory
+        save_quote_volume_cache(cache_dir, timeframe, cache_entries)
+
+    return candles_matrix
+
+
+class VolumeIndex(NamedTuple):
+    # Cumulative quote volume per pair, row i holds the sum of the first i candles,
+    # so the total of any date slice is a subtraction of two rows
+    dates: np.ndarray
+    pairs: List[str]
+    cumulative: np.ndarray
+    # dates x pairs, pairlist filters result right after each candle, see get_pairlist_filters_mask
+    filters_mask: Optional[np.ndarray] = None
+
+
+def build_volume_index(dates, pairs, quote_volume, filters_mask=None):
+    cumulative = np.zeros((len(dates) + 1, len(pairs)))
+    np.cumsum(np.nan_to_num(quote_volume), axis=0, out=cumulative[1:])
+
+    return VolumeIndex(dates, pairs, cumulative, filters_mask)
+
+
+def process_candles_data(candles_matrix, filter_price, filters_mask=None):
+    # apply price filter on the whole matrix at once: quoteVolume of candles closed below
+    # min price is 0 so the pair is ignored for the candles in question
+    quote_volume = np.where(candles_matrix.close < filter_price, 0, candles_matrix.quote_volume)
+
+    return build_volume_index(candles_matrix.dates, candles_matrix.pairs, quote_volume, filters_mask)
+
+
+def get_window_starts(dates, days):
+    # First row of the days daily candles freqtrade fetches when refreshing right after candle i closed
+    return np.searchsorted(dates, dates + np.timedelta64(1, 'D') - np.timedelta64(days, 'D'), side='left')
+
+
+def get_pairlist_filters_mask(candles_matrix, pairlist_filters):
+    # Emulation of freqtrade's AgeFilter, VolatilityFilter and RangeStabilityFilter on daily candles.
+    # Row i tells which pairs would pass all filters evaluated with the data up to candle i,
+    # each filter is a couple of rolling passes over the whole matrix instead of per pair work.
+    # Like freqtrade, a filter sees the daily candles of its lookback days before the refresh.
+    dates = candles_matrix.dates
+    mask = np.ones(candles_matrix.close.shape, dtype=bool)
+    has_candle = ~np.isnan(candles_matrix.close)
+    # candles[i] is the number of candles of the first i rows
+    candles = np.zeros((len(dates) + 1, len(candles_matrix.pairs)), dtype='int64')
+    np.cumsum(has_candle, axis=0, out=candles[1:])
+    rows = np.arange(len(dates))
+
+    for pairlist_filter in pairlist_filters:
+        method = pairlist_filter['method']
+
+        if method == 'AgeFilter':
+            # at least min_days_listed candles in the last min_days_listed days,
+            # a pair which passed once is never checked again
+            min_days_listed = pairlist_filter['min_days_listed']
+            starts = get_window_starts(dates, min_days_listed)
+            listed = candles[rows + 1] - candles[starts] >= min_days_listed
+            mask &= np.logical_or.accumulate(listed, axis=0)
+
+        elif method == 'VolatilityFilter':
+            # freqtrade's returns are log(close / next close) over the lookback days candles, with 0 for the
+            # last one, their std times sqrt(lookback_days) is the volatility. The pair needs a candle on
+            # every day of the lookback, otherwise the rolling std and so its mean are NaN and it fails.
+            # The std is taken from sums of the returns, row j holding log(close[j - 1] / close[j]).
+            lookback_days = pairlist_filter.get('lookback_days', 10)
+            starts = get_window_starts(dates, lookback_days)
+            complete = candles[rows + 1] - candles[starts] == lookback_days
+            returns = np.zeros(candles_matrix.close.shape)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                returns[1:] = np.nan_to_num(np.log(candles_matrix.close[:-1] / candles_matrix.close[1:]))
+            sums = np.zeros((2, len(dates) + 1, len(candles_matrix.pairs)))
+            np.cumsum(returns, axis=0, out=sums[0, 1:])
+            np.cumsum(returns ** 2, axis=0, out=sums[1, 1:])
+            # returns of rows starts + 1 to i, plus the 0 of the last candle
+            total, total_squares = sums[:, rows + 1] - sums[:, np.minimum(starts + 1, rows + 1)]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                variance = (total_squares - total ** 2 / lookback_days) / (lookback_days - 1)
+                volatility = np.sqrt(np.maximum(variance, 0)) * np.sqrt(lookback_days)
+            volatility[~complete] = np.nan
+            mask &= volatility >= pairlist_filter.get('min_volatility', 0)
+            mask &= volatility <= pairlist_filter.get('max_volatility', sys.maxsize)
+
+        elif method == 'RangeStabilityFilter':
+            # highest high and lowest low of the candles there are in the lookback days
+            lookback_days = pairlist_filter.get('lookback_days', 10)
+            window = f'{lookback_days}D'
+            highest_high = pd.DataFrame(candles_matrix.high, index=dates).rolling(window).max().to_numpy()
+            lowest_low = pd.DataFrame(candles_matrix.low, index=dates).rolling(window).min().to_numpy()
+            rate_of_change = (highest_high - lowest_low) / lowest_low
+            mask &= rate_of_change >= pairlist_filter.get('min_rate_of_change', 0.01)
+            mask &= rate_of_change <= pairlist_filter.get('max_rate_of_change', sys.maxsize)
+
+        else:
+            raise ValueError(f"{method} can't be emulated, supported filters are "
+                             f"AgeFilter, VolatilityFilter and RangeStabilityFilter")
+
+    return mask
+
+
+def get_slice_filters(volume_index, date_slices):
+    # Filters are evaluated when the pairlist gets refreshed, with the candles closed before the slice starts
+    starts = np.array([date_slice['start'] for date_slice in date_slices], dtype='datetime64[ns]')
+    rows = np.searchsorted(volume_index.dates, starts, side='left') - 1
+
+    # nothing known about pairs before the first candle
+    return np.where((rows >= 0)[:, None], volume_index.filters_mask[np.maximum(rows, 0)], False)
+
+
+def get_slice_totals(volume_index, date_slices):
+    # rolling slices are ranked on their trailing window instead of the slice itself
+    starts = np.array([date_slice.get('rank_start', date_slice['start']) for date_slice in date_slices],
+                      dtype='datetime64[ns]')
+    ends = np.array([date_slice.get('rank_end', date_slice['end']) for date_slice in date_slices],
+                    dtype='datetime64[ns]')
+
+    # candles with start <= date < end
+    start_rows = np.searchsorted(volume_index.dates, starts, side='left')
+    end_rows = np.searchsorted(volume_index.dates, ends, side='left')
+
+    return volume_index.cumulative[end_rows] - volume_index.cumulative[start_rows]
 
-        if len(candles):
-            # Not sure about AgeFilter
-            # apply price filter make price 0 to ignore this pair after calculation of quoteVolume
-            candles.loc[(candles.close < filter_price), 'close'] = 0
-            column_name = pair
-            candles[column_name] = candles['volume'] * candles['close']
 
-            if full_dataframe.empty:
-                full_dataframe = candles[['date', column_name]].copy()
-            else:
-                full_dataframe = pd.merge(full_dataframe, candles[['date', column_name]].copy(), on='date', how='left')
-            # print("Loaded " + str(len(candles)) + f" rows of data for {pair} from {data_location}")
-            # print(full_dataframe.tail(1))
+def select_top_pairs(totals, number_assets):
+    # Column indexes of the pairs with the biggest volume, biggest first.
+    # Only the top number_assets are partitioned out and sorted instead of the whole row.
+    candidates = np.flatnonzero(totals > 0)
 
-    print(full_dataframe.head())
+    if len(candidates) > number_assets:
+        candidates = candidates[np.argpartition(-totals[candidates], number_assets - 1)[:number_assets]]
 
-    full_dataframe['date'] = full_dataframe['date'].dt.tz_localize(None)
+    return candidates[np.lexsort((candidates, -totals[candidates]))]
 
-    return full_dataframe
 
+def process_date_slices(volume_index, date_slices, number_assets_arr):
+    # Every slice is ranked once up to the biggest number of assets,
+    # the smaller pairlists are prefixes of that ranking
+    results = {number_assets: {} for number_assets in number_assets_arr}
+    slice_totals = get_slice_totals(volume_index, date_slices)
 
-def process_date_slices(df, date_slices, number_assets):
-    result = {}
-    for date_slice in date_slices:
-        df_slice = df[(df.date >= date_slice['start']) & (df.date < date_slice['end'])].copy()
-        summarised = df_slice.sum()
-        summarised = summarised[summarised > 0]
-        summarised = summarised.sort_values(ascending=False)
+    if volume_index.filters_mask is not None and len(date_slices):
+        slice_totals[~get_slice_filters(volume_index, date_slices)] = 0
 
-        if len(summarised) > number_assets:
-            result_pairs_list = list(summarised.index[:number_assets])
+    for date_slice, totals in zip(date_slices, slice_totals):
+        ranked_pairs = [volume_index.pairs[column] for column in select_top_pairs(totals, max(number_assets_arr))]
+
+        if len(ranked_pairs) > 0:
+            timerange = get_slice_timerange(date_slice)
+            for number_assets in number_assets_arr:
+                results[number_assets][timerange] = ranked_pairs[:number_assets]
+
+    return results
+
+
+def get_slice_boundaries(interval_arr, start_date_str, end_date_str):
+    # Every date at which any slice of the sweep starts or ends, sorted
+    boundaries = set()
+    for interval in interval_arr:
+        for date_slice in get_data_slices_dates(None, start_date_str, end_date_str, interval):
+            boundaries.update(date_slice[key] for key in ('start', 'end', 'rank_start', 'rank_end') if key in date_slice)
+
+    return np.array(sorted(boundaries), dtype='datetime64[ns]')
+
+
+def stream_pair_bucket_totals(pair, datadir, timeframe, boundaries, asset_filter_price_arr, chunksize,
+                              verbose=False):
+    # Reads the pair's HDF5 data in chunks of rows and reduces every chunk straight into the quote volume
+    # between consecutive slice boundaries, one float32 row per min price. Peak memory is bounded
+    # by the chunk size whatever the timeframe or history length.
+    from freqtrade.misc import pair_to_filename
+
+    file_name = Path(datadir, f'{pair_to_filename(pair)}-{timeframe}.h5')
+    if not file_name.is_file():
+        return None
+
+    totals = np.zeros((len(asset_filter_price_arr), len(boundaries) - 1), dtype='float32')
+    first_date = last_date = None
+    candles = 0
+    # same key and date filter as freqtrade's hdf5 data handler
+    where = [
+        f"date >= Timestamp({boundaries[0].astype('int64')})",
+        f"date < Timestamp({boundaries[-1].astype('int64')})",
+    ]
+
+    with pd.HDFStore(file_name, mode='r') as store:
+        for chunk in store.select(f'{pair}/ohlcv/tf_{timeframe}', where=where, columns=['date', 'close', 'volume'],
+                                  chunksize=chunksize):
+            if not len(chunk):
+                continue
+
+            dates = chunk['date'].dt.tz_localize(None).to_numpy(dtype='datetime64[ns]')
+            close = chunk['close'].to_numpy(dtype='float64')
+            quote_volume = np.nan_to_num(chunk['volume'].to_numpy(dtype='float64') * close)
+            buckets = np.searchsorted(boundaries, dates, side='right') - 1
+
+            for row, asset_filter_price in enumerate(asset_filter_price_arr):
+                totals[row] += np.bincount(buckets, weights=np.where(close < asset_filter_price, 0, quote_volume),
+                                           minlength=len(boundaries) - 1)
+
+            first_date = dates[0] if first_date is None else first_date
+            last_date = dates[-1]
+            candles += len(chunk)
+
+    if verbose:
+        print("Streamed " + str(candles) + f" rows of data for {pair} from {datadir}")
+
+    if not candles:
+        return None
+
+    pair_state = {
+        'first': pd.Timestamp(first_date).strftime(DATE_TIME_FORMAT),
+        'last': pd.Timestamp(last_date).strftime(DATE_TIME_FORMAT),
+        'candles': candles,
+    }
+
+    return pair, totals, pair_state
+
+
+def stream_volume_indexes(pairs, datadir, timeframe, boundaries, asset_filter_price_arr, workers=1,
+                          verbose=False, chunksize=100000):
+    # Intraday counterpart of load_candles_matrix + process_candles_data. Rows of the volume indexes
+    # are the buckets between slice boundaries instead of candles, which is all the slices need.
+    stream_pair = partial(stream_pair_bucket_totals, datadir=datadir, timeframe=timeframe, boundaries=boundaries,
+                          asset_filter_price_arr=asset_filter_price_arr, chunksize=chunksize, verbose=verbose)
+
+    if workers > 1 and len(pairs) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(stream_pair, pairs, chunksize=max(1, len(pairs) // (workers * 4))))
+    else:
+        results = list(map(stream_pair, pairs))
+
+    results = [result for result in results if result is not None]
+    streamed_pairs = [result[0] for result in results]
+    pairs_state = {result[0]: result[2] for result in results}
+    # min price x bucket x pair
+    totals = np.zeros((len(asset_filter_price_arr), len(boundaries) - 1, len(results)), dtype='float32')
+    for column, result in enumerate(results):
+        totals[:, :, column] = result[1]
+
+    volume_indexes = [
+        (asset_filter_price, build_volume_index(boundaries[:-1], streamed_pairs, totals[row]))
+        for row, asset_filter_price in enumerate(asset_filter_price_arr)
+    ]
+
+    return volume_indexes, pairs_state
+
+
+def sweep_pairlists(volume_indexes, interval_arr, number_assets_arr, start_date_str, end_date_str,
+                    recompute_from=None):
+    # volume_indexes yields (asset_filter_price, volume_index)
+    # Yields (asset_filter_price, interval, number_assets, {'timerange': [pairlist]})
+    # for the whole sweep with one volume index per price and one ranking per slice.
+    # With recompute_from only the slices ending after that date are ranked.
+    date_slices = {
+        interval: [
+            date_slice for date_slice in get_data_slices_dates(None, start_date_str, end_date_str, interval)
+            if recompute_from is None or date_slice['end'] > recompute_from
+        ]
+        for interval in interval_arr
+    }
+
+    for asset_filter_price, volume_index in volume_indexes:
+        for interval in interval_arr:
+            results = process_date_slices(volume_index, date_slices[interval], number_assets_arr)
+
+            for number_assets in number_assets_arr:
+                yield asset_filter_price, interval, number_assets, results[number_assets]
+
+
+def get_candles_state(candles_matrix):
+    # First and last candle date and number of candles of every pair,
+    # compared between runs to find which slices got new or changed data
+    has_candle = ~np.isnan(candles_matrix.close)
+    dates = pd.to_datetime(candles_matrix.dates).strftime(DATE_TIME_FORMAT)
+    first_rows = has_candle.argmax(axis=0)
+    last_rows = len(has_candle) - 1 - has_candle[::-1].argmax(axis=0)
+    candles = has_candle.sum(axis=0)
+
+    return {
+        pair: {'first': dates[first_rows[column]], 'last': dates[last_rows[column]], 'candles': int(candles[column])}
+        for column, pair in enumerate(candles_matrix.pairs)
+    }
+
+
+def get_recompute_from(previous_state, pairs_state, end_date_str):
+    # Earliest date touched by data that changed since the previous run.
+    # When the end date moved the last slice of the previous run was cut short, so it is recomputed too.
+    previous_end_date = datetime.strptime(previous_state['end_date'], DATE_TIME_FORMAT)
+    end_date = datetime.strptime(end_date_str, DATE_TIME_FORMAT)
+    if previous_end_date == end_date:
+        recompute_from = end_date
+    else:
+        recompute_from = min(previous_end_date, end_date) - timedelta(seconds=1)
+    previous_pairs_state = previous_state['pairs']
+
+    for pair in set(previous_pairs_state) | set(pairs_state):
+        previous = previous_pairs_state.get(pair)
+        current = pairs_state.get(pair)
+
+        if previous == current:
+            continue
+        if previous is None:
+            changed_from = current['first']
+        elif current is None:
+            changed_from = previous['first']
+        elif previous['first'] != current['first'] or previous['last'] == current['last']:
+            # history was re-downloaded, not only appended to
+            changed_from = min(previous['first'], current['first'])
         else:
-            result_pairs_list = list(summarised.index)
+            # new candles appended, last known candle could have been incomplete
+            changed_from = previous['last']
+
+        recompute_from = min(recompute_from, datetime.strptime(changed_from, DATE_TIME_FORMAT))
 
-        if len(result_pairs_list) > 0:
-            result[f'{date_slice["start"].strftime(DATE_FORMAT)}-{date_slice["end"].strftime(DATE_FORMAT)}'] = result_pairs_list
+    return recompute_from
 
-    return result
+
+def get_slice_timerange(date_slice):
+    return f'{date_slice["start"].strftime(DATE_FORMAT)}-{date_slice["end"].strftime(DATE_FORMAT)}'
+
+
+def get_timerange_end(timerange):
+    return datetime.strptime(timerange.split('-')[1], DATE_FORMAT)
+
+
+def get_pairlist_file_name(interval, number_assets, asset_filter_price, start_string, end_string, timeframe):
+    # pairlists ranked on other than daily candles get the timeframe appended
+    timeframe_suffix = '' if timeframe == TIMEFRAME else f'_{timeframe}'
+    return f'user_data/pairlists/{STAKE_CURRENCY}/{interval}/{interval}_{number_assets}_{STAKE_CURRENCY}_{str(asset_filter_price).replace(".", ",")}_minprice_{start_string}_{end_string}{timeframe_suffix}.json'
+
+
+def get_pairlist_store_file_name(interval_arr, start_string, end_string, timeframe):
+    # one store per interval set, so e.g. a rolling run doesn't replace the calendar intervals rankings
+    timeframe_suffix = '' if timeframe == TIMEFRAME else f'_{timeframe}'
+    return f'user_data/pairlists/{STAKE_CURRENCY}/pairlists_{STAKE_CURRENCY}_{"_".join(interval_arr)}_{start_string}_{end_string}{timeframe_suffix}.bin'
+
+
+def get_pairlist_state_file_name(interval_arr, timeframe):
+    # state of the incremental mode, kept per store
+    timeframe_suffix = '' if timeframe == TIMEFRAME else f'-{timeframe}'
+    return f'user_data/pairlists/{STAKE_CURRENCY}/.pairlist_state_{"_".join(interval_arr)}{timeframe_suffix}.json'
+
+
+# Pairlist store layout: 8 bytes little endian header length, json header, then raw little endian arrays at
+# 8 byte aligned offsets (counted from the end of the header) listed in the header. Per interval one int64
+# array of slice start/end epoch seconds, and per min price one array of pair ids ranked up to the biggest
+# number of assets, -1 where fewer pairs had volume.
+PAIRLIST_STORE_VERSION = 1
+
+
+def write_pairlist_store(file_name, date_slices, number_assets_arr, asset_filter_price_arr, rankings):
+    # date_slices: {interval: [date_slice]}, rankings: {(interval, asset_filter_price): {'timerange': [pairlist]}}
+    pairs = sorted({pair for ranking in rankings.values() for pairlist in ranking.values() for pair in pairlist})
+    pair_ids = {pair: pair_id for pair_id, pair in enumerate(pairs)}
+    ranks_dtype = '<i2' if len(pairs) < np.iinfo('int16').max else '<i4'
+    width = max(number_assets_arr)
+
+    header = {
+        'version': PAIRLIST_STORE_VERSION,
+        'pairs': pairs,
+        'number_assets': number_assets_arr,
+        'min_prices': asset_filter_price_arr,
+        'ranks_dtype': ranks_dtype,
+        'width': width,
+        'intervals': {},
+    }
+    arrays = []
+    offset = 0
+
+    for interval, interval_slices in date_slices.items():
+        bounds = np.array([[date_slice['start'], date_slice['end']] for date_slice in interval_slices],
+                          dtype='datetime64[s]').astype('<i8').reshape(-1, 2)
+        interval_header = {'slices': len(interval_slices), 'bounds': offset, 'ranks': {}}
+        arrays.append(bounds)
+        offset += bounds.nbytes
+
+        for asset_filter_price in asset_filter_price_arr:
+            ranks = np.full((len(interval_slices), width), -1, dtype=ranks_dtype)
+            ranking = rankings[(interval, asset_filter_price)]
+            for row, date_slice in enumerate(interval_slices):
+                pairlist = ranking.get(get_slice_timerange(date_slice), [])
+                ranks[row, :len(pairlist)] = [pair_ids[pair] for pair in pairlist]
+
+            interval_header['ranks'][str(asset_filter_price)] = offset
+            arrays.append(ranks)
+            # padded so the next array stays aligned
+            offset += ranks.nbytes + (-ranks.nbytes % 8)
+
+        header['intervals'][interval] = interval_header
+
+    header_bytes = json.dumps(header).encode()
+    header_bytes += b' ' * (-len(header_bytes) % 8)
+
+    os.makedirs(os.path.dirname(file_name), exist_ok=True)
+    with open(f'{file_name}.tmp', 'wb') as f:
+        f.write(np.array(len(header_bytes), dtype='<u8').tobytes())
+        f.write(header_bytes)
+        for array in arrays:
+            f.write(array.tobytes())
+            f.write(b'\0' * (-array.nbytes % 8))
+    os.replace(f'{file_name}.tmp', file_name)
+
+
+class PairlistReader:
+    """
+    Reads pairlists written by write_pairlist_store. Only the header is parsed,
+    slices and ranks are memory mapped so a query only touches the rows it needs.
+
+        reader = PairlistReader('user_data/pairlists/BUSD/pairlists_BUSD_monthly_weekly_daily_20180101_20211001.bin')
+        reader.get_pairlist('20210501-20210502', 60, 0.01)
+        reader.get_pairlists('weekly', 90, 0)  # {'timerange': [pairlist]} like the json export
+    """
+
+    def __init__(self, file_name):
+        self.file_name = file_name
+        with open(file_name, 'rb') as f:
+            header_length = int(np.frombuffer(f.read(8), dtype='<u8')[0])
+            self.header = json.loads(f.read(header_length))
+        self.data_offset = 8 + header_length
+        self.pairs = self.header['pairs']
+
+    def covers(self, interval_arr, number_assets_arr, asset_filter_price_arr):
+        return (
+            all(interval in self.header['intervals'] for interval in interval_arr)
+            and max(number_assets_arr) <= self.header['width']
+            and all(asset_filter_price in self.header['min_prices'] for asset_filter_price in asset_filter_price_arr)
+        )
+
+    def _array(self, offset, dtype, shape):
+        if not shape[0]:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.file_name, dtype=dtype, mode='r', offset=self.data_offset + offset, shape=shape)
+
+    def _bounds(self, interval):
+        interval_header = self.header['intervals'][interval]
+        return self._array(interval_header['bounds'], '<i8', (interval_header['slices'], 2))
+
+    def _ranks(self, interval, asset_filter_price):
+        interval_header = self.header['intervals'][interval]
+        return self._array(interval_header['ranks'][str(asset_filter_price)], self.header['ranks_dtype'],
+                           (interval_header['slices'], self.header['width']))
+
+    def _pairlist(self, ranks_row, number_assets):
+        return [self.pairs[pair_id] for pair_id in ranks_row[:number_assets] if pair_id >= 0]
+
+    def get_pairlist(self, timerange, number_assets, asset_filter_price, interval='daily'):
+        # pairlist of the slice the timerange starts in, e.g. 20210501-20210502 or 20210501
+        start = np.datetime64(datetime.strptime(timerange.split('-')[0], DATE_FORMAT), 's').astype('int64')
+        bounds = self._bounds(interval)
+        row = np.searchsorted(bounds[:, 0], start, side='right') - 1
+
+        if row < 0 or start >= bounds[row, 1]:
+            return []
+
+        return self._pairlist(self._ranks(interval, asset_filter_price)[row], number_assets)
+
+    def get_pairlists(self, interval, number_assets, asset_filter_price):
+        bounds = self._bounds(interval)
+        ranks = self._ranks(interval, asset_filter_price)
+        result = {}
+
+        for (start, end), ranks_row in zip(bounds, ranks):
+            pairlist = self._pairlist(ranks_row, number_assets)
+            if pairlist:
+                date_slice = {'start': datetime.utcfromtimestamp(start), 'end': datetime.utcfromtimestamp(end)}
+                result[get_slice_timerange(date_slice)] = pairlist
+
+        return result
 
 
 def main():
@@ -162,8 +858,26 @@ def main():
                         help="timerange as per freqtrade format, e.g. 20210401-, 20210101-20210201, etc")
     parser.add_argument("-o", "--outfile", help="path where output the pairlist", type=argparse.FileType('w'))
     parser.add_argument("-mp", "--minprice", help="price for price filter")
-    parser.add_argument("-tf", "--timeframe", help="timeframe of loaded candles data")
+    parser.add_argument("-tf", "--timeframe",
+                        help="timeframe of loaded candles data, intraday data is streamed in chunks")
+    parser.add_argument("--chunk-size", help="rows read at once when streaming intraday data", type=int,
+                        default=100000)
     parser.add_argument("-na", "--numberassets", help="number of assets to be filtered")
+    parser.add_argument("-j", "--jobs", help="number of worker processes used to load pairs data", type=int,
+                        default=1)
+    parser.add_argument("--rolling", nargs=2, metavar=("WINDOW", "STEP"),
+                        help="emulate VolumePairList ranking on a trailing WINDOW refreshed every STEP, e.g. 7d 1d")
+    parser.add_argument("--offline", help="take pairs from downloaded data files instead of exchange markets",
+                        action="store_true")
+    parser.add_argument("--refresh-pairs", help="resolve pairs again instead of using the cached list",
+                        action="store_true")
+    parser.add_argument("--no-cache", help="do not use the on-disk quote volume cache", action="store_true")
+    parser.add_argument("-i", "--incremental", help="only recompute slices touched by data changed since last run",
+                        action="store_true")
+    parser.add_argument("--export-json", help="also write every pairlist as a separate json file",
+                        action="store_true")
+    parser.add_argument("-v", "--verbose", help="print every loaded pair and generated pairlist",
+                        action="store_true")
     args = parser.parse_args()
 
     # Make this argparseble
@@ -181,28 +895,119 @@ def main():
     # ASSET_FILTER_PRICE_ARR = [0]
     # NUMBER_ASSETS_ARR = [90]
 
+    if args.rolling:
+        window, step = args.rolling
+        if parse_duration(step) < timedelta(days=1):
+            parser.error("rolling step shouldn't be less than a day, pairlists are keyed by daily timeranges")
+        INTERVAL_ARR = [f'rolling_{window}_{step}']
+
+    if args.timerange:
+        # open end means up to the last complete day
+        timerange_start, _, timerange_end = args.timerange.partition('-')
+        if timerange_start:
+            START_DATE_STR = f'{timerange_start} 00:00:00'
+        END_DATE_STR = f'{timerange_end} 00:00:00' if timerange_end else datetime.utcnow().strftime('%Y%m%d 00:00:00')
+
     start_string = START_DATE_STR.split(' ')[0]
     end_string = END_DATE_STR.split(' ')[0]
 
 
-    for asset_filter_price in ASSET_FILTER_PRICE_ARR:
+    timeframe = args.timeframe or TIMEFRAME
+    pairs = resolve_pairs(DATA_LOCATION, timeframe, offline=args.offline, refresh=args.refresh_pairs)
+    print(f"found {str(len(pairs))} pairs on {EXCHANGE_NAME}")
 
-        volume_dataframe = process_candles_data(pairs, asset_filter_price)
+    if timeframe[-1] in ('m', 'h'):
+        # intraday candles are too many to hold in memory, stream them into slice totals instead
+        if PAIRLIST_FILTERS:
+            print("pairlist filters are emulated on daily candles only, they're not applied to intraday ranking")
+        boundaries = get_slice_boundaries(INTERVAL_ARR, START_DATE_STR, END_DATE_STR)
+        volume_indexes, pairs_state = stream_volume_indexes(
+            pairs, DATA_LOCATION, timeframe, boundaries, ASSET_FILTER_PRICE_ARR, workers=args.jobs,
+            verbose=args.verbose, chunksize=args.chunk_size)
+    else:
+        candles_matrix = load_candles_matrix(pairs, DATA_LOCATION, timeframe, workers=args.jobs,
+                                             verbose=args.verbose, use_cache=not args.no_cache)
+        pairs_state = get_candles_state(candles_matrix)
+        filters_mask = get_pairlist_filters_mask(candles_matrix, PAIRLIST_FILTERS) if PAIRLIST_FILTERS else None
+        volume_indexes = (
+            (asset_filter_price, process_candles_data(candles_matrix, asset_filter_price, filters_mask))
+            for asset_filter_price in ASSET_FILTER_PRICE_ARR
+        )
 
-        for interval in INTERVAL_ARR:
-            date_slices = get_data_slices_dates(volume_dataframe, START_DATE_STR, END_DATE_STR, interval)
+    state_file_name = get_pairlist_state_file_name(INTERVAL_ARR, timeframe)
+    recompute_from = None
+    previous_end_string = end_string
+    previous_store = None
+
+    if args.incremental and os.path.isfile(state_file_name):
+        with open(state_file_name) as f:
+            previous_state = json.load(f)
+        previous_end_string = previous_state['end_date'].split(' ')[0]
+        previous_store_file_name = get_pairlist_store_file_name(INTERVAL_ARR, start_string, previous_end_string,
+                                                                timeframe)
+        if previous_state['start_date'] == START_DATE_STR and os.path.isfile(previous_store_file_name):
+            previous_store = PairlistReader(previous_store_file_name)
+        if previous_store is not None and previous_store.covers(INTERVAL_ARR, NUMBER_ASSETS_ARR, ASSET_FILTER_PRICE_ARR):
+            recompute_from = get_recompute_from(previous_state, pairs_state, END_DATE_STR)
+            print(f"incremental update, recomputing slices ending after {recompute_from}")
+        else:
+            previous_store = None
+
+    # pairlists ranked up to the biggest number of assets, the store keeps only those
+    rankings = {}
+
+    for asset_filter_price, interval, number_assets, result_obj in sweep_pairlists(
+            volume_indexes, INTERVAL_ARR, NUMBER_ASSETS_ARR, START_DATE_STR, END_DATE_STR, recompute_from):
+        previous_result_obj = None
+
+        if recompute_from is not None:
+            # keep the untouched slices of the previous output, they come before the recomputed ones
+            previous_result_obj = previous_store.get_pairlists(interval, number_assets, asset_filter_price)
+            result_obj = {
+                **{timerange: pairlist for timerange, pairlist in previous_result_obj.items()
+                   if get_timerange_end(timerange) <= recompute_from},
+                **result_obj
+            }
 
-            for number_assets in NUMBER_ASSETS_ARR:
+        if number_assets == max(NUMBER_ASSETS_ARR):
+            rankings[(interval, asset_filter_price)] = result_obj
 
-                result_obj = process_date_slices(volume_dataframe, date_slices, number_assets)
-                # {'timerange': [pairlist]}
-                print(result_obj)
+        # {'timerange': [pairlist]}
+        if args.verbose:
+            print(result_obj)
+
+        if args.export_json:
+            file_name = get_pairlist_file_name(interval, number_assets, asset_filter_price, start_string, end_string,
+                                               timeframe)
+            if result_obj != previous_result_obj or not os.path.isfile(file_name):
                 p_json = json.dumps(result_obj, indent=4)
-                file_name = f'user_data/pairlists/{STAKE_CURRENCY}/{interval}/{interval}_{number_assets}_{STAKE_CURRENCY}_{str(asset_filter_price).replace(".", ",")}_minprice_{start_string}_{end_string}.json'
                 os.makedirs(os.path.dirname(file_name), exist_ok=True)
                 with open(file_name, 'w') as f:
                     f.write(p_json)
 
+            previous_file_name = get_pairlist_file_name(interval, number_assets, asset_filter_price, start_string,
+                                                        previous_end_string, timeframe)
+            if previous_file_name != file_name and os.path.isfile(previous_file_name):
+                # superseded by the file covering the new timerange
+                os.remove(previous_file_name)
+
+    date_slices = {
+        interval: get_data_slices_dates(None, START_DATE_STR, END_DATE_STR, interval) for interval in INTERVAL_ARR
+    }
+    store_file_name = get_pairlist_store_file_name(INTERVAL_ARR, start_string, end_string, timeframe)
+    write_pairlist_store(store_file_name, date_slices, NUMBER_ASSETS_ARR, ASSET_FILTER_PRICE_ARR, rankings)
+    print(f"pairlists stored in {store_file_name}")
+
+    previous_store_file_name = get_pairlist_store_file_name(INTERVAL_ARR, start_string, previous_end_string,
+                                                            timeframe)
+    if previous_store_file_name != store_file_name and os.path.isfile(previous_store_file_name):
+        # superseded by the store covering the new timerange
+        os.remove(previous_store_file_name)
+
+    os.makedirs(os.path.dirname(state_file_name), exist_ok=True)
+    with open(state_file_name, 'w') as f:
+        json.dump({'start_date': START_DATE_STR, 'end_date': END_DATE_STR, 'pairs': pairs_state}, f)
+
 
     # Save result object as json to --outfile location
     print('Done.')
@@ -0,0 +1,105 @@
+import importlib.util
+import sys
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip('freqtrade.optimize.hyperopt_interface')
+pytest.importorskip('skopt')
+cloudpickle = pytest.importorskip('cloudpickle')
+
+HYPEROPTS_DIR = Path(__file__).parent.parent / 'user_data' / 'hyperopts'
+sys.path.append(str(HYPEROPTS_DIR))
+import bincluc_indicators  # noqa: E402
+
+PAIR = 'ETH/BTC'
+PARAMS = {
+    'bbdelta_multiplier': 0.008,
+    'closedelta_multiplier': 0.017,
+    'tail_multiplier': 0.25,
+    'bband_size_bin': 40,
+    'bband_size_cluc_buy': 20,
+    'ema_slow_size': 50,
+    'volume_mean_slow_size': 30,
+    'volume_mean_multiplier_size': 20,
+    'bb_lowerband_multiplier': 0.985,
+}
+
+
+def load_hyperopt():
+    # like freqtrade's resolver: executed from its file, without registering it in sys.modules,
+    # so cloudpickle pickles the class by value
+    spec = importlib.util.spec_from_file_location('BinClucHyperOpt', HYPEROPTS_DIR / 'BinClucHyperOpt.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.BinClucHyperOpt
+
+
+def candles(size):
+    rng = np.random.default_rng(0)
+    close = np.exp(rng.normal(0, 0.01, size).cumsum()) * 10
+    spread = np.abs(rng.normal(0, 0.005, size))
+    return pd.DataFrame({
+        'date': pd.date_range('2021-01-01', periods=size, freq='5min', tz='UTC'),
+        'open': close * (1 + rng.normal(0, 0.003, size)),
+        'high': close * (1 + spread),
+        'low': close * (1 - spread),
+        'close': close,
+        'volume': rng.lognormal(5, 1, size),
+    })
+
+
+@pytest.fixture
+def computed(monkeypatch, tmp_path):
+    # window indicators computed, by name
+    counts = Counter()
+    compute_window_indicator = bincluc_indicators.compute_window_indicator
+
+    def counting_compute_window_indicator(dataframe, pair, name, window):
+        counts[name] += 1
+        return compute_window_indicator(dataframe, pair, name, window)
+
+    monkeypatch.setattr(bincluc_indicators, 'compute_window_indicator', counting_compute_window_indicator)
+    monkeypatch.setattr(bincluc_indicators, 'INDICATOR_INPUTS_DIR', tmp_path)
+    monkeypatch.setattr(bincluc_indicators, 'window_caches', {})
+    monkeypatch.setattr(bincluc_indicators, 'indicator_inputs', {})
+    monkeypatch.setenv(bincluc_indicators.INDICATOR_RUN_ENV, 'test')
+    return counts
+
+
+def test_window_cache_kept_across_pickled_epochs(computed):
+    hyperopt = load_hyperopt()
+    # startup candles are cut off after populate_indicators
+    dataframe = hyperopt.populate_indicators(candles(2000), {'pair': PAIR}).iloc[200:].reset_index(drop=True)
+
+    buy = []
+    computed_per_epoch = []
+    for _ in range(2):
+        # the workers get the hyperopt pickled by value with every task
+        epoch_hyperopt = cloudpickle.loads(cloudpickle.dumps(hyperopt))
+        buy.append(epoch_hyperopt.buy_strategy_generator(PARAMS)(dataframe.copy(), {'pair': PAIR})['buy'])
+        computed_per_epoch.append(sum(computed.values()))
+
+    assert computed_per_epoch[0] > 0
+    assert computed_per_epoch[1] == computed_per_epoch[0]
+    pd.testing.assert_series_equal(buy[0], buy[1])
+
+
+def test_parameter_independent_parts_computed_once_across_pickled_epochs(computed):
+    hyperopt = load_hyperopt()
+    dataframe = hyperopt.populate_indicators(candles(2000), {'pair': PAIR}).iloc[200:].reset_index(drop=True)
+    rng = np.random.default_rng(1)
+
+    for _ in range(5):
+        # same windows, other multipliers every epoch
+        params = {**PARAMS, 'bbdelta_multiplier': rng.uniform(0.005, 0.013),
+                  'tail_multiplier': rng.uniform(0.19, 0.31), 'bb_lowerband_multiplier': rng.uniform(0.965, 0.995)}
+        epoch_hyperopt = cloudpickle.loads(cloudpickle.dumps(hyperopt))
+        epoch_hyperopt.buy_strategy_generator(params)(dataframe.copy(), {'pair': PAIR})
+
+    assert computed['binhv45'] == 1
+    assert computed['close_below_ema'] == 1
+    assert computed['volume_mean_shifted'] == 1
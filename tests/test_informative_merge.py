@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent / 'user_data' / 'strategies'))
+from informative_merge import merge_informative_columns  # noqa: E402
+
+COLUMNS = ['close', 'rsi']
+
+
+def merge_informative_pair(dataframe, informative, timeframe_inf, minutes, minutes_inf):
+    # freqtrade 2021.9 merge_informative_pair(ffill=True), followed by dropping the informative suffix
+    # like the strategies did
+    informative = informative.copy()
+    informative['date_merge'] = (informative['date'] + pd.to_timedelta(minutes_inf, 'm')
+                                 - pd.to_timedelta(minutes, 'm'))
+    informative.columns = [f'{col}_{timeframe_inf}' for col in informative.columns]
+    dataframe = pd.merge(dataframe, informative, left_on='date', right_on=f'date_merge_{timeframe_inf}', how='left')
+    dataframe = dataframe.drop(f'date_merge_{timeframe_inf}', axis=1)
+    dataframe = dataframe.ffill()
+    return dataframe[['date', 'volume'] + [f'{col}_{timeframe_inf}' for col in COLUMNS]].rename(
+        columns={f'{col}_{timeframe_inf}': col for col in COLUMNS})
+
+
+def candles(rng, size, freq, nans=0):
+    dataframe = pd.DataFrame({
+        'date': pd.date_range('2021-01-01', periods=size, freq=freq, tz='UTC'),
+        'close': np.exp(rng.normal(0, 0.01, size).cumsum()) * 10,
+        'rsi': rng.uniform(0, 100, size),
+        'volume': rng.lognormal(5, 1, size),
+    })
+    dataframe.loc[rng.integers(0, size, nans), 'rsi'] = np.nan
+    return dataframe
+
+
+@pytest.mark.parametrize('gaps', [False, True])
+@pytest.mark.parametrize('cached', [False, True])
+def test_merge_informative_columns_matches_merge_informative_pair(gaps, cached):
+    rng = np.random.default_rng(int(gaps) + 2 * int(cached))
+    base = candles(rng, 12 * 300, '5min')[['date', 'volume']]
+    if gaps:
+        base = base.drop(index=range(1000, 1100)).reset_index(drop=True)
+    informative = candles(rng, 300, '1h', nans=60)
+    if gaps:
+        informative = informative.drop(index=range(150, 160)).reset_index(drop=True)
+    cache = {} if cached else None
+
+    # sliding windows like live: the informative candles lag behind the base ones now and then
+    for end in range(1200, 1500):
+        inf_end = (end + 7) // 12 + 1 - (end % 17 == 0)
+        window = base.iloc[end - 1000:end].reset_index(drop=True)
+        informative_window = informative.iloc[max(inf_end - 100, 0):inf_end].reset_index(drop=True)
+
+        expected = merge_informative_pair(window, informative_window, '1h', 5, 60)
+        merged = merge_informative_columns(window, informative_window, 'X', COLUMNS, '5m', '1h', cache)
+
+        pd.testing.assert_frame_equal(merged, expected)
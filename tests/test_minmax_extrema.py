@@ -0,0 +1,60 @@
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from scipy.signal import argrelextrema
+
+sys.path.append(str(Path(__file__).parent.parent / 'user_data' / 'strategies'))
+from MinmaxF import RollingExtrema  # noqa: E402
+
+
+def argrelextrema_signals(closes, order, frame_size):
+    # the per frame loop RollingExtrema replaces: the penultimate candle of every frame
+    # being a min / max is the signal of the candle right after the frame
+    buy_signal = np.zeros(len(closes), dtype=bool)
+    sell_signal = np.zeros(len(closes), dtype=bool)
+    for i in range(len(closes)):
+        if i + frame_size < len(closes):
+            frame = closes[i:i + frame_size]
+            min_peaks = argrelextrema(frame, np.less, order=order)
+            max_peaks = argrelextrema(frame, np.greater, order=order)
+            if len(min_peaks[0]) and min_peaks[0][-1] == frame_size - 2:
+                buy_signal[i + frame_size] = True
+            if len(max_peaks[0]) and max_peaks[0][-1] == frame_size - 2:
+                sell_signal[i + frame_size] = True
+    return buy_signal, sell_signal
+
+
+def random_closes(rng, size, decimals, nans=0):
+    # rounded prices so that equal closes (no strict extrema) show up as well
+    closes = np.round(np.exp(rng.normal(0, 0.02, size).cumsum()) * 100, decimals)
+    closes[rng.integers(0, size, nans)] = np.nan
+    return closes
+
+
+@pytest.mark.parametrize('order,frame_size', [(100, 500), (5, 20), (3, 5)])
+@pytest.mark.parametrize('decimals,nans', [(3, 0), (0, 0), (3, 5)])
+def test_rolling_extrema_matches_argrelextrema(order, frame_size, decimals, nans):
+    rng = np.random.default_rng(order + decimals + nans)
+    closes = random_closes(rng, 1500, decimals, nans)
+    expected_buy, expected_sell = argrelextrema_signals(closes, order, frame_size)
+
+    buy_signal, sell_signal = RollingExtrema(order=order, frame_size=frame_size).run(closes)
+
+    assert expected_buy.any() and expected_sell.any()
+    np.testing.assert_array_equal(buy_signal, expected_buy)
+    np.testing.assert_array_equal(sell_signal, expected_sell)
+
+
+@pytest.mark.parametrize('pieces', [2, 7, 1500])
+def test_rolling_extrema_fed_in_pieces(pieces):
+    rng = np.random.default_rng(pieces)
+    closes = random_closes(rng, 1500, 1, nans=3)
+    expected_buy, expected_sell = argrelextrema_signals(closes, 100, 500)
+
+    extrema = RollingExtrema(order=100, frame_size=500)
+    signals = [extrema.run(piece) for piece in np.array_split(closes, pieces)]
+
+    np.testing.assert_array_equal(np.concatenate([buy for buy, _ in signals]), expected_buy)
+    np.testing.assert_array_equal(np.concatenate([sell for _, sell in signals]), expected_sell)
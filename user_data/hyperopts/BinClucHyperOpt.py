@@ -16,6 +16,11 @@ from freqtrade.optimize.hyperopt_interface import IHyperOpt
 # Add your lib to import here
 import talib.abstract as ta  # noqa
 import freqtrade.vendor.qtpylib.indicators as qtpylib
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from bincluc_indicators import get_window_values, save_indicator_inputs
 
 informative_timeframe = '1h'
 
@@ -26,6 +31,35 @@ volume_mean_slow_arr = [i for i in range(10, 50 + 1, 5)]
 
 volume_mean_multiplier_arr = [i for i in range(10, 30 + 1, 5)]
 
+def get_buy_signals(dataframe, metadata, params_list):
+    # Buy signals of K parameter sets in one pass, a (K, candles) boolean array. The parts which don't depend
+    # on the multipliers are cached per pair and window, the multipliers are applied by broadcasting.
+    close = dataframe['close'].values
+
+    def stack(name, key, item=None):
+        values = [get_window_values(dataframe, metadata['pair'], name, params[key]) for params in params_list]
+        return np.stack([value[item] for value in values] if item is not None else values)
+
+    def multiplier(key):
+        return np.array([params[key] for params in params_list], dtype=np.float64)[:, None]
+
+    bbdelta = stack('binhv45', 'bband_size_bin', 0)
+    binhv45 = (
+        stack('binhv45', 'bband_size_bin', 1) &
+        (bbdelta > close * multiplier('bbdelta_multiplier')) &
+        (dataframe['closedelta'].values > close * multiplier('closedelta_multiplier')) &
+        (dataframe['tail'].values < bbdelta * multiplier('tail_multiplier'))
+    )
+    # strategy ClucMay72018
+    cluc = (
+        stack('close_below_ema', 'ema_slow_size') &
+        (close < multiplier('bb_lowerband_multiplier') * stack('bollinger_bands', 'bband_size_cluc_buy', 1)) &
+        (dataframe['volume'].values < stack('volume_mean_shifted', 'volume_mean_slow_size')
+         * multiplier('volume_mean_multiplier_size'))
+    )
+
+    return binhv45 | cluc
+
 
 class BinClucHyperOpt(IHyperOpt):
     """
@@ -46,25 +80,13 @@ class BinClucHyperOpt(IHyperOpt):
 
         typical_price = qtpylib.typical_price(dataframe)
 
-        for i in bb_arr_bin:
-            bollinger = qtpylib.bollinger_bands(typical_price, window=i, stds=2)
-            mid = bollinger['mid']
-            lower = bollinger['lower']
-            dataframe[f'mid_{i}'] = np.nan_to_num(mid)
-            dataframe[f'lower_{i}'] = np.nan_to_num(lower)
-            dataframe[f'bbdelta_{i}'] = (dataframe[f'mid_{i}'] - dataframe[f'lower_{i}']).abs()
-
-        for i in bb_arr_cluc:
-            # strategy ClucMay72018
-            bollinger = qtpylib.bollinger_bands(typical_price, window=i, stds=2)
-            dataframe[f'bb_lowerband_{i}'] = bollinger['lower']
-            dataframe[f'bb_middleband_{i}'] = bollinger['mid']
-
-        for i in ema_slow_arr:
-            dataframe[f'ema_slow_{i}'] = ta.EMA(dataframe, timeperiod=i)
-
-        for i in volume_mean_slow_arr:
-            dataframe[f'volume_mean_slow_{i}'] = dataframe['volume'].rolling(window=i).mean()
+        # only the inputs of the per window indicators, these are computed by the generators
+        save_indicator_inputs(metadata['pair'], {
+            'date': dataframe['date'].values,
+            'typical_price': typical_price.values,
+            'close': dataframe['close'].values,
+            'volume': dataframe['volume'].values,
+        })
 
         dataframe['pricedelta'] = (dataframe['open'] - dataframe['close']).abs()
         dataframe['closedelta'] = (dataframe['close'] - dataframe['close'].shift()).abs()
@@ -81,27 +103,7 @@ class BinClucHyperOpt(IHyperOpt):
             """
             Buy strategy Hyperopt will build and use.
             """
-
-            dataframe.loc[
-                (
-                    (
-                        dataframe[f'lower_{params["bband_size_bin"]}'].shift().gt(0) &
-                        dataframe[f'bbdelta_{params["bband_size_bin"]}'].gt(dataframe['close'] * params['bbdelta_multiplier']) &
-                        dataframe['closedelta'].gt(dataframe['close'] * params['closedelta_multiplier']) &
-                        dataframe['tail'].lt(dataframe[f'bbdelta_{params["bband_size_bin"]}'] * params['tail_multiplier']) &
-                        dataframe['close'].lt(dataframe[f'lower_{params["bband_size_bin"]}'].shift()) &
-                        dataframe['close'].le(dataframe['close'].shift())
-                    )
-                    |
-                    (  # strategy ClucMay72018
-                        (dataframe['close'] < dataframe[f'ema_slow_{params["ema_slow_size"]}']) &
-                        (dataframe['close'] < params['bb_lowerband_multiplier'] * dataframe[f'bb_lowerband_{params["bband_size_cluc_buy"]}']) &
-                        (dataframe['volume'] < (dataframe[f'volume_mean_slow_{params["volume_mean_slow_size"]}'].shift(1) * params['volume_mean_multiplier_size']))
-                    )
-                 )
-
-                ,
-                'buy'] = 1
+            dataframe.loc[get_buy_signals(dataframe, metadata, [params])[0], 'buy'] = 1
 
             return dataframe
 
@@ -133,8 +135,10 @@ class BinClucHyperOpt(IHyperOpt):
             """
             no sell signal
             """
+            bb_middleband, _ = get_window_values(dataframe, metadata['pair'], 'bollinger_bands',
+                                                 params['bband_size_cluc_sell'])
             dataframe.loc[
-                (dataframe['close'] > dataframe[f'bb_middleband_{params["bband_size_cluc_sell"]}']),
+                (dataframe['close'].values > bb_middleband),
                 'sell'
             ] = 1
             return dataframe
@@ -1,7 +1,8 @@
 from freqtrade.optimize.hyperopt import IHyperOptLoss
 import math
 from datetime import datetime
-from pandas import DataFrame, date_range
+import numpy as np
+from pandas import DataFrame, Series, date_range
 import pandas as pd
 from freqtrade.data.btanalysis import calculate_max_drawdown
 
@@ -26,6 +27,18 @@ DURATION_WEIGHT = 10
 IGNORE_SMALL_PROFITS = False
 SMALL_PROFITS_THRESHOLD = 0.001  # 0.1%
 
+DAY_NS = pd.Timedelta(days=1).value
+# (first day in ns, number of days) of the daily index per (min_date, max_date), fixed for a hyperopt run
+daily_index_cache = {}
+
+
+def get_daily_index(min_date: datetime, max_date: datetime):
+    key = (min_date, max_date)
+    if key not in daily_index_cache:
+        t_index = date_range(start=min_date, end=max_date, freq='1D', normalize=True)
+        daily_index_cache[key] = (t_index[0].value if len(t_index) else 0, len(t_index))
+    return daily_index_cache[key]
+
 
 def sortino_daily(results: DataFrame, trade_count: int,
                   min_date: datetime, max_date: datetime,
@@ -38,32 +51,31 @@ def sortino_daily(results: DataFrame, trade_count: int,
     Sortino Ratio calculated as described in
     http://www.redrockcapital.com/Sortino__A__Sharper__Ratio_Red_Rock_Capital.pdf
     """
-    resample_freq = '1D'
     slippage_per_trade_ratio = 0.0005
     days_in_year = 365
     minimum_acceptable_return = 0.0
 
     # apply slippage per trade to profit_ratio
-    results.loc[:, 'profit_ratio_after_slippage'] = \
-        results['profit_ratio'] - slippage_per_trade_ratio
-
-    # create the index within the min_date and end max_date
-    t_index = date_range(start=min_date, end=max_date, freq=resample_freq,
-                         normalize=True)
-
-    sum_daily = (
-        results.resample(resample_freq, on='close_date').agg(
-            {"profit_ratio_after_slippage": sum}).reindex(t_index).fillna(0)
-    )
-
-    total_profit = sum_daily["profit_ratio_after_slippage"] - minimum_acceptable_return
+    profit_ratio_after_slippage = results['profit_ratio'].values - slippage_per_trade_ratio
+
+    # sum the profits per day of the index within the min_date and end max_date,
+    # close dates are bucketed by their distance in days from the first day. The profits are summed in
+    # close date order with the same aggregation as resample().agg({...: sum}), so the sums are exactly the same.
+    first_day, days = get_daily_index(min_date, max_date)
+    close_date = pd.DatetimeIndex(results['close_date']).asi8 - first_day
+    order = np.argsort(close_date, kind='stable')
+    day = close_date[order] // DAY_NS
+    in_index = (day >= 0) & (day < days)
+    sum_per_day = Series(profit_ratio_after_slippage[order][in_index]).groupby(day[in_index]).agg(sum)
+    sum_daily = np.zeros(days)
+    sum_daily[sum_per_day.index.values] = sum_per_day.values
+
+    total_profit = Series(sum_daily) - minimum_acceptable_return
     expected_returns_mean = total_profit.mean()
 
-    sum_daily['downside_returns'] = 0
-    sum_daily.loc[total_profit < 0, 'downside_returns'] = total_profit
-    total_downside = sum_daily['downside_returns']
+    total_downside = total_profit.clip(upper=0)
     # Here total_downside contains min(0, P - MAR) values,
-    # where P = sum_daily["profit_ratio_after_slippage"]
+    # where P = sum_daily
     down_stdev = math.sqrt((total_downside ** 2).sum() / len(total_downside))
 
     if down_stdev != 0:
@@ -72,7 +84,7 @@ def sortino_daily(results: DataFrame, trade_count: int,
         # Define high (negative) sortino ratio to be clear that this is NOT optimal.
         sortino_ratio = -20.
 
-    # print(t_index, sum_daily, total_profit)
+    # print(sum_daily, total_profit)
     # print(minimum_acceptable_return, expected_returns_mean, down_stdev, sortino_ratio)
     return -sortino_ratio
 
@@ -0,0 +1,227 @@
+# pragma pylint: disable=missing-docstring, invalid-name
+
+# Window indicators of BinClucHyperOpt and their caches. The hyperopt file is loaded by freqtrade's resolver
+# without registering it as a module, so the workers get its functions and globals pickled by value, fresh
+# with every task. This module is imported by name instead (the hyperopt adds its directory to sys.path,
+# which the workers inherit), so a worker keeps these caches from one epoch to the next.
+import atexit
+import logging
+import os
+import shutil
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable
+
+import numpy as np
+import pandas as pd
+import talib
+from pandas import DataFrame
+
+import freqtrade.vendor.qtpylib.indicators as qtpylib
+from freqtrade.misc import pair_to_filename
+
+logger = logging.getLogger(__name__)
+
+# The per window indicators are only computed once a sampled parameter uses the window, then kept in an
+# LRU per pair. Hyperopt cuts the startup candles off the dataframes after populate_indicators, so the
+# whole history of their inputs is saved there for the workers to compute the windows from, the computed
+# windows are saved there as well and memory mapped by all workers.
+# Every hyperopt run gets its own directory, named after the pid of the process running populate_indicators.
+# The name is passed to the workers in the environment: they are started after the data got prepared and
+# inherit it. So concurrent sessions (other timeranges, other warmups) never read each other's files.
+# The directory (several GB with many pairs of 5m candles) is removed when that process exits.
+INDICATOR_INPUTS_DIR = Path(__file__).parent.parent / 'hyperopt_results' / 'BinClucHyperOpt'
+INDICATOR_RUN_ENV = 'BINCLUC_HYPEROPT_RUN'
+INDICATOR_INPUTS = ['date', 'typical_price', 'close', 'volume']
+# window indicators and conditions kept per pair
+WINDOW_CACHE_SIZE = 32
+
+window_caches = {}
+indicator_inputs = {}
+
+
+def get_run_dir():
+    run = os.environ.get(INDICATOR_RUN_ENV)
+    return None if run is None else Path(INDICATOR_INPUTS_DIR, run)
+
+
+def remove_run_dir(run_dir, pid):
+    # registered at exit of the process owning the run, forked children inherit the handler
+    if os.getpid() == pid:
+        shutil.rmtree(run_dir, ignore_errors=True)
+
+
+def start_run():
+    # Called by populate_indicators, the first call of this process makes it a new run. The directories
+    # of the runs whose process is gone without removing them (killed) are removed as well.
+    run = f'run-{os.getpid()}'
+    if os.environ.get(INDICATOR_RUN_ENV) == run:
+        return
+    os.environ[INDICATOR_RUN_ENV] = run
+    atexit.register(remove_run_dir, get_run_dir(), os.getpid())
+
+    for run_dir in INDICATOR_INPUTS_DIR.glob('run-*'):
+        try:
+            os.kill(int(run_dir.name[len('run-'):]), 0)
+        except ProcessLookupError:
+            shutil.rmtree(run_dir, ignore_errors=True)
+        except (ValueError, OSError):
+            pass
+
+
+# a run has a single timeframe, the file names don't need it
+def get_inputs_file_name(run_dir, pair, name):
+    return Path(run_dir, f'{pair_to_filename(pair)}-{name}.npy')
+
+
+def get_history_file_name(run_dir, pair, version, name, window):
+    return Path(run_dir, f'{pair_to_filename(pair)}-{version}-{name}-{window}.npy')
+
+
+def save_array(file_name, values):
+    # written to a temporary file first, so the other workers never map a partial file
+    temporary_file_name = file_name.with_suffix(f'.{os.getpid()}.tmp.npy')
+    np.save(temporary_file_name, values)
+    os.replace(temporary_file_name, file_name)
+
+
+def save_indicator_inputs(pair, inputs):
+    start_run()
+    run_dir = get_run_dir()
+    os.makedirs(run_dir, exist_ok=True)
+    # indicators published from the previous inputs
+    for file_name in run_dir.glob(f'{pair_to_filename(pair)}-*-*-*.npy'):
+        try:
+            os.remove(file_name)
+        except FileNotFoundError:
+            pass
+    for name in INDICATOR_INPUTS:
+        save_array(get_inputs_file_name(run_dir, pair, name), inputs[name])
+
+
+def load_indicator_inputs(pair):
+    # read only memory maps, opened again once populate_indicators saved newer ones.
+    # Returns (run_dir, version, inputs), version being the modification time of the saved dates.
+    run_dir = get_run_dir()
+    if run_dir is None:
+        return None, None, None
+    file_names = [get_inputs_file_name(run_dir, pair, name) for name in INDICATOR_INPUTS]
+    try:
+        version = tuple(os.stat(file_name).st_mtime_ns for file_name in file_names)
+    except FileNotFoundError:
+        return None, None, None
+
+    cached = indicator_inputs.get((run_dir, pair))
+    if cached is None or cached[0] != version:
+        inputs = {name: np.load(file_name, mmap_mode='r') for name, file_name in zip(INDICATOR_INPUTS, file_names)}
+        cached = (version, inputs)
+        indicator_inputs[(run_dir, pair)] = cached
+
+    return run_dir, cached[0][0], cached[1]
+
+
+def compute_history_indicator(inputs, name, window):
+    if name == 'bollinger_bands':
+        bollinger = qtpylib.bollinger_bands(pd.Series(inputs['typical_price']), window=window, stds=2)
+        return np.stack((bollinger['mid'].values, bollinger['lower'].values))
+    if name == 'ema':
+        return talib.EMA(np.asarray(inputs['close'], dtype=np.float64), timeperiod=window)
+    if name == 'volume_mean':
+        return pd.Series(inputs['volume']).rolling(window=window).mean().values
+    raise ValueError(f"unknown window indicator {name}")
+
+
+def get_history_indicator(run_dir, pair, version, inputs, name, window):
+    # Indicators over the whole saved history are published next to the inputs by the first worker
+    # computing them, the others map the file read only, so their pages are shared between the workers.
+    file_name = get_history_file_name(run_dir, pair, version, name, window)
+    try:
+        return np.load(file_name, mmap_mode='r')
+    except FileNotFoundError:
+        pass
+
+    values = compute_history_indicator(inputs, name, window)
+    try:
+        save_array(file_name, values)
+    except OSError as e:
+        logger.warning(f"couldn't publish {file_name.name}: {e}")
+        return values
+    return np.load(file_name, mmap_mode='r')
+
+
+def compute_window_indicator(dataframe, pair, name, window):
+    dates = dataframe['date'].values
+    run_dir, version, inputs = load_indicator_inputs(pair)
+    start = np.searchsorted(inputs['date'], dates[0]) if inputs is not None and len(dates) else 0
+    end = start + len(dates)
+    history = (inputs is not None and len(dates) and end <= len(inputs['date'])
+               and inputs['date'][start] == dates[0] and inputs['date'][end - 1] == dates[-1])
+    if not history:
+        if pair not in window_caches or not window_caches[pair].entries:
+            logger.warning(f"no saved history for {pair}, computing its indicators without the startup candles")
+        inputs = {
+            'typical_price': qtpylib.typical_price(dataframe).values,
+            'close': dataframe['close'].values,
+            'volume': dataframe['volume'].values,
+        }
+        start, end = 0, len(dates)
+
+    def indicator(name):
+        if history:
+            values = get_history_indicator(run_dir, pair, version, inputs, name, window)
+        else:
+            values = compute_history_indicator(inputs, name, window)
+        return values[..., start:end]
+
+    close = dataframe['close'].values
+    if name == 'bollinger_bands':
+        mid, lower = indicator('bollinger_bands')
+        return mid, lower
+    if name == 'binhv45':
+        # bbdelta and the parameter independent part of the BinHV45 condition, shifts are within the dataframe
+        # like pandas' shift(). The first lower band is NaN instead of 0 but it fails the conditions either way.
+        mid, lower = get_window_values(dataframe, pair, 'bollinger_bands', window)
+        previous_lower = shift(lower)
+        condition = (previous_lower > 0) & (close < previous_lower) & (close <= shift(close))
+        return np.abs(mid - lower), condition
+    if name == 'close_below_ema':
+        return close < indicator('ema')
+    if name == 'volume_mean_shifted':
+        return shift(indicator('volume_mean'))
+    raise ValueError(f"unknown window indicator {name}")
+
+
+def shift(values):
+    return np.concatenate(([np.nan], values[:-1]))
+
+
+class WindowCache:
+    # LRU of the window indicators of one pair. Candles are identified by their count and first / last dates,
+    # so a dataframe cut differently (other timerange, startup candles) doesn't share the warmup dependent
+    # values. Returned values are shared between callers and must not be modified in place.
+
+    def __init__(self, maxsize: int = WINDOW_CACHE_SIZE):
+        self.maxsize = maxsize
+        self.entries = OrderedDict()
+
+    def get(self, dataframe: DataFrame, name: str, window: int, compute: Callable[[], Any]) -> Any:
+        dates = dataframe['date']
+        key = (len(dates), dates.iloc[0], dates.iloc[-1], name, window) if len(dates) else None
+        if key is not None and key in self.entries:
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        value = compute()
+        if key is not None:
+            self.entries[key] = value
+            if len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+        return value
+
+
+def get_window_values(dataframe, pair, name, window):
+    if pair not in window_caches:
+        window_caches[pair] = WindowCache()
+    return window_caches[pair].get(
+        dataframe, name, window,
+        lambda: compute_window_indicator(dataframe, pair, name, window))
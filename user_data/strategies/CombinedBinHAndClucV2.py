@@ -2,14 +2,23 @@
 import freqtrade.vendor.qtpylib.indicators as qtpylib
 import numpy as np
 # --------------------------------
+import sys
+from pathlib import Path
+
+import talib
 import talib.abstract as ta
-from freqtrade.strategy import IStrategy, merge_informative_pair
-from pandas import DataFrame
+from freqtrade.strategy import IStrategy
+from pandas import DataFrame, Series
+
+sys.path.append(str(Path(__file__).parent))
+from informative_merge import get_informative_dataframe, is_live, merge_informative_columns
 
 
 # The main idea is to buy only when overall uptrend in higher informative
 # but in local dip cause BinCluc some king of pullback strategy.
 
+ATR_PERIOD = 14
+
 
 def bollinger_bands(stock_price, window_size, num_of_std):
     rolling_mean = stock_price.rolling(window=window_size).mean()
@@ -18,16 +27,77 @@ def bollinger_bands(stock_price, window_size, num_of_std):
     return np.nan_to_num(rolling_mean), np.nan_to_num(lower_band)
 
 
+def ssl_channels(high, low, close, length=7, state=None):
+    # SSL channels on the candle arrays, returns (ssl_down, ssl_up, state).
+    # Without a state it's a full pass. With the state of the previous call only the appended candles
+    # are passed and their channels returned; their rolling means are taken over the last `length`
+    # candles alone, so these can differ from a full pass in the last bits.
+    if state is not None and not len(close):
+        return np.empty(0), np.empty(0), state
+
+    if state is None or state['count'] <= ATR_PERIOD:
+        appended = len(close)
+        if state is not None:
+            # ATR isn't warmed up yet, all candles are still in the state
+            high = np.concatenate((state['high'], high))
+            low = np.concatenate((state['low'], low))
+            close = np.concatenate((state['close'], close))
+        atr = talib.ATR(high, low, close, timeperiod=ATR_PERIOD)
+        sma_high = Series(high).rolling(length).mean().values + atr
+        sma_low = Series(low).rolling(length).mean().values - atr
+        count = len(close)
+        previous_hlv = np.nan
+        high, low, close, atr = high[-appended:], low[-appended:], close[-appended:], atr[-appended:]
+        sma_high, sma_low = sma_high[-appended:], sma_low[-appended:]
+    else:
+        # Wilder's smoothing exactly as talib does it
+        previous_close = np.concatenate((state['close'][-1:], close[:-1]))
+        true_range = np.maximum(high - low, np.maximum(np.abs(previous_close - high), np.abs(low - previous_close)))
+        atr = np.empty(len(close))
+        previous_atr = state['atr']
+        for i, value in enumerate(true_range):
+            previous_atr = (previous_atr * (ATR_PERIOD - 1) + value) / ATR_PERIOD
+            atr[i] = previous_atr
+
+        def rolling_mean(history, values):
+            history = history[max(len(history) - length + 1, 0):] if length > 1 else history[:0]
+            history = np.concatenate((np.full(length - 1 - len(history), np.nan), history, values))
+            return np.lib.stride_tricks.sliding_window_view(history, length).mean(axis=1)
+
+        sma_high = rolling_mean(state['high'], high) + atr
+        sma_low = rolling_mean(state['low'], low) - atr
+        count = state['count'] + len(close)
+        previous_hlv = state['hlv']
+
+    # 1 above the high channel, -1 below the low one, otherwise unchanged
+    signal = np.where(close > sma_high, 1.0, np.where(close < sma_low, -1.0, np.nan))
+    last_signal = np.where(np.isnan(signal), -1, np.arange(len(signal)))
+    last_signal = np.maximum.accumulate(last_signal) if len(signal) else last_signal
+    hlv = np.where(last_signal >= 0, signal[last_signal], previous_hlv)
+
+    ssl_down = np.where(hlv < 0, sma_high, sma_low)
+    ssl_up = np.where(hlv < 0, sma_low, sma_high)
+
+    keep = max(length, ATR_PERIOD + 1)
+    if state is not None and len(close) < keep:
+        high, low, close = (np.concatenate((state[k][len(close) - keep:], v))
+                            for k, v in (('high', high), ('low', low), ('close', close)))
+    state = {
+        'count': count,
+        'high': high[-keep:],
+        'low': low[-keep:],
+        'close': close[-keep:],
+        'atr': atr[-1] if len(atr) else np.nan,
+        'hlv': hlv[-1] if len(hlv) else previous_hlv,
+    }
+
+    return ssl_down, ssl_up, state
+
+
 def SSLChannels(dataframe, length = 7):
-    df = dataframe.copy()
-    df['ATR'] = ta.ATR(df, timeperiod=14)
-    df['smaHigh'] = df['high'].rolling(length).mean() + df['ATR']
-    df['smaLow'] = df['low'].rolling(length).mean() - df['ATR']
-    df['hlv'] = np.where(df['close'] > df['smaHigh'], 1, np.where(df['close'] < df['smaLow'], -1, np.NAN))
-    df['hlv'] = df['hlv'].ffill()
-    df['sslDown'] = np.where(df['hlv'] < 0, df['smaHigh'], df['smaLow'])
-    df['sslUp'] = np.where(df['hlv'] < 0, df['smaLow'], df['smaHigh'])
-    return df['sslDown'], df['sslUp']
+    ssl_down, ssl_up, _ = ssl_channels(dataframe['high'].values, dataframe['low'].values, dataframe['close'].values,
+                                       length)
+    return Series(ssl_down, index=dataframe.index, name='sslDown'), Series(ssl_up, index=dataframe.index, name='sslUp')
 
 
 class CombinedBinHAndClucV2(IStrategy):
@@ -39,6 +109,8 @@ class CombinedBinHAndClucV2(IStrategy):
     }
 
     informative_timeframe = '1h'
+    # informative indicators joined to the base dataframe
+    informative_columns = ['ssl_down', 'ssl_up', 'ssl_high', 'mfi', 'srsi_fk', 'srsi_fd', 'go_long']
     timeframe = '5m'
 
     stoploss = -0.05
@@ -59,6 +131,13 @@ class CombinedBinHAndClucV2(IStrategy):
 
     startup_candle_count = 200
 
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        # live / dry-run only, pair -> (last informative candle, informative dataframe with its indicators)
+        self.informative_cache = {}
+        # live / dry-run only, pair -> candles the alignment was computed for and their informative rows
+        self.informative_index_cache = {}
+
     def informative_pairs(self):
         pairs = self.dp.current_whitelist()
         informative_pairs = [(pair, self.informative_timeframe) for pair in pairs]
@@ -92,18 +171,13 @@ class CombinedBinHAndClucV2(IStrategy):
         if not self.dp:
             return dataframe
 
-        informative = self.dp.get_pair_dataframe(pair=metadata['pair'], timeframe=self.informative_timeframe)
-
-        informative = self.get_informative_indicators(informative.copy(), metadata)
-
-        dataframe = merge_informative_pair(dataframe, informative, self.timeframe, self.informative_timeframe,
-                                           ffill=True)
-        # don't overwrite the base dataframe's HLCV information
-        skip_columns = [(s + "_" + self.informative_timeframe) for s in
-                        ['date', 'open', 'high', 'low', 'close', 'volume']]
-        dataframe.rename(
-            columns=lambda s: s.replace("_{}".format(self.informative_timeframe), "") if (not s in skip_columns) else s,
-            inplace=True)
+        live = is_live(self.dp)
+        informative = get_informative_dataframe(self.dp, metadata['pair'], self.informative_timeframe,
+                                                self.get_informative_indicators,
+                                                self.informative_cache if live else None)
+        dataframe = merge_informative_columns(dataframe, informative, metadata['pair'], self.informative_columns,
+                                              self.timeframe, self.informative_timeframe,
+                                              self.informative_index_cache if live else None)
 
         typical_price = qtpylib.typical_price(dataframe)
 
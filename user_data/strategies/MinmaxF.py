@@ -7,10 +7,92 @@ from pandas import DataFrame
 
 import talib.abstract as ta
 import freqtrade.vendor.qtpylib.indicators as qtpylib
-from scipy.signal import argrelextrema
+from collections import deque
 import numpy as np
 
 
+class RollingExtrema:
+    """
+    Lookahead free local min/max detector, same signals as running argrelextrema
+    on a sliding frame and taking its penultimate candle, in linear time.
+
+    argrelextrema with order=N reports the penultimate candle of a frame as a min (max)
+    when its close is strictly lower (higher) than the N closes before it and the close
+    right after it. So the signal of a candle only needs the closes up to the previous one.
+    Closes are fed one at a time, min and max of the N closes window are kept in monotonic
+    deques, so every candle costs O(1) amortized instead of two argrelextrema calls.
+    """
+
+    def __init__(self, order: int = 100, frame_size: int = 500):
+        # signals start at frame_size like the first full frame did
+        assert frame_size >= order + 2, "frame should hold the window, the candidate and the next candle"
+        self.order = order
+        self.frame_size = frame_size
+        self.index = -1
+        self.closes = deque(maxlen=3)
+        # (index, close) with increasing closes for min, decreasing for max
+        self.min_window = deque()
+        self.max_window = deque()
+        self.last_nan = -1 - order - 2
+        # signals of the candle after the last fed close
+        self.pending = (False, False)
+
+    def update(self, close: float):
+        """
+        Feed the close of the next candle. Returns (buy_signal, sell_signal)
+        of the candle after it: the candle before this one was a min / max.
+        """
+        self.index += 1
+        index = self.index
+        self.closes.append(close)
+        if close != close:
+            self.last_nan = index
+
+        # the window of the candidate (index - 1) are the `order` closes before it
+        window_index = index - 2
+        if window_index >= 0:
+            window_close = self.closes[0]
+            if window_close == window_close:
+                while self.min_window and self.min_window[-1][1] >= window_close:
+                    self.min_window.pop()
+                self.min_window.append((window_index, window_close))
+                while self.max_window and self.max_window[-1][1] <= window_close:
+                    self.max_window.pop()
+                self.max_window.append((window_index, window_close))
+
+        window_start = index - 1 - self.order
+        while self.min_window and self.min_window[0][0] < window_start:
+            self.min_window.popleft()
+        while self.max_window and self.max_window[0][0] < window_start:
+            self.max_window.popleft()
+
+        # any NaN in the window, the candidate or the next close fails argrelextrema's comparisons
+        if index + 1 < self.frame_size or self.last_nan >= window_start:
+            return False, False
+
+        candidate, next_close = self.closes[1], self.closes[2]
+        is_min = candidate < next_close and candidate < self.min_window[0][1]
+        is_max = candidate > next_close and candidate > self.max_window[0][1]
+        return is_min, is_max
+
+    def run(self, closes: np.ndarray):
+        """
+        Signals aligned with the given closes, continuing from the closes fed before.
+        The signal of each candle is produced by the close before it.
+        """
+        buy_signal = np.zeros(len(closes), dtype=bool)
+        sell_signal = np.zeros(len(closes), dtype=bool)
+        if not len(closes):
+            return buy_signal, sell_signal
+
+        buy_signal[0], sell_signal[0] = self.pending
+        for i, close in enumerate(closes[:-1], start=1):
+            buy_signal[i], sell_signal[i] = self.update(close)
+        self.pending = self.update(closes[-1])
+
+        return buy_signal, sell_signal
+
+
 class Minmax(IStrategy):
 
     minimal_roi = {
@@ -23,35 +105,52 @@ class Minmax(IStrategy):
 
     trailing_stop = False
 
-    process_only_new_candles = False
+    # signals only change when a candle closes
+    process_only_new_candles = True
+
+    frame_size = 500
+    lookback_size = 100
+
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        # live / dry-run only: per pair extrema detector and the signals of the candles it was fed
+        self.extrema_state: Dict[str, dict] = {}
+
+    def get_extrema_signals(self, dataframe: DataFrame, pair: str):
+        dates = dataframe['date'].values
+        closes = dataframe['close'].values
+        live = self.dp is not None and self.dp.runmode.value in ('live', 'dry_run')
+        state = self.extrema_state.get(pair) if live else None
+
+        if state is not None and len(dates):
+            # candles seen on the previous call which are still in the dataframe
+            known = np.searchsorted(state['dates'], dates[0])
+            processed = len(state['dates']) - known
+            if (0 < processed <= len(dates) and state['dates'][known] == dates[0]
+                    and state['dates'][-1] == dates[processed - 1]):
+                # evaluate only the appended candles
+                buy_signal, sell_signal = state['extrema'].run(closes[processed:])
+                buy_signal = np.concatenate([state['buy_signal'][known:], buy_signal])
+                sell_signal = np.concatenate([state['sell_signal'][known:], sell_signal])
+                state.update(dates=dates, buy_signal=buy_signal, sell_signal=sell_signal)
+                return buy_signal, sell_signal
+
+        # first call or history got reloaded, start over
+        extrema = RollingExtrema(order=self.lookback_size, frame_size=self.frame_size)
+        buy_signal, sell_signal = extrema.run(closes)
+        if live:
+            self.extrema_state[pair] = {
+                'extrema': extrema, 'dates': dates, 'buy_signal': buy_signal, 'sell_signal': sell_signal
+            }
+
+        return buy_signal, sell_signal
 
     def populate_indicators(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
 
-        dataframe_copy = dataframe.copy()
-        frame_size = 500
-        len_df = len(dataframe)
-        dataframe['buy_signal'] = False
-        dataframe['sell_signal'] = False
-        lookback_size = 100
-        # Let's calculate argrelextrema on separated data slices and get only last result to avoid lookahead bias!
-        for i in range(len_df):
-            if i + frame_size < len_df:
-                slice = dataframe_copy[i : i+frame_size]
-                min_peaks = argrelextrema(slice['close'].values, np.less, order=lookback_size)
-                max_peaks = argrelextrema(slice['close'].values, np.greater, order=lookback_size)
-                # Somehow we never getting last index of a frame as min or max. What a surprise :)
-                # So lets take penultimate result and use it as a signal to buy/sell.
-                if len(min_peaks[0]) and min_peaks[0][-1] == frame_size - 2:
-                    # signal that penultimate candle is min
-                    # lets buy here
-                    dataframe.at[i + frame_size,'buy_signal'] = True
-                if len(max_peaks[0]) and max_peaks[0][-1] == frame_size - 2:
-                    # oh it seams that penultimate candle is max
-                    # lets sell ASAP
-                    dataframe.at[i + frame_size, 'sell_signal'] = True
-
-                if i + frame_size == len_df - 1:
-                    print(min_peaks)
+        # Let's find extrema on the data before every candle only and get the last result to avoid lookahead bias!
+        # Somehow we never getting last index of a frame as min or max. What a surprise :)
+        # So penultimate candle being min/max is used as a signal to buy/sell on the next one.
+        dataframe['buy_signal'], dataframe['sell_signal'] = self.get_extrema_signals(dataframe, metadata['pair'])
 
         #                                                                               A
         # Wow what a pathetic results!!!Where is my Trillions of BTC?!?!?!              |
@@ -81,8 +180,6 @@ class Minmax(IStrategy):
         return dataframe
 
     def populate_buy_trend(self, dataframe: DataFrame, metadata: dict) -> DataFrame:
-        print(dataframe.tail(30))
-
 
         dataframe.loc[
             (
@@ -1,5 +1,5 @@
 # --- Do not remove these libs ---
-from freqtrade.strategy import IStrategy, merge_informative_pair
+from freqtrade.strategy import IStrategy
 from typing import Dict, List
 from functools import reduce
 from pandas import DataFrame
@@ -8,6 +8,11 @@ from pandas import DataFrame
 import talib.abstract as ta
 from datetime import datetime, timedelta
 from freqtrade.persistence import Trade
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent))
+from informative_merge import get_informative_dataframe, is_live, merge_informative_columns
 
 
 # thanks tirail for original SMAOffset sharing
@@ -22,6 +27,8 @@ class SMAOffsetV2(IStrategy):
     stoploss = -0.20
     timeframe = '5m'
     informative_timeframe = '1h'
+    # informative indicators joined to the base dataframe
+    informative_columns = ['ema_fast', 'ema_slow', 'go_long']
     use_sell_signal = True
     sell_profit_only = False
     process_only_new_candles = True
@@ -29,6 +36,13 @@ class SMAOffsetV2(IStrategy):
     use_custom_stoploss = True
     startup_candle_count = 200
 
+    def __init__(self, config: dict) -> None:
+        super().__init__(config)
+        # live / dry-run only, pair -> (last informative candle, informative dataframe with its indicators)
+        self.informative_cache = {}
+        # live / dry-run only, pair -> candles the alignment was computed for and their informative rows
+        self.informative_index_cache = {}
+
     def custom_stoploss(self, pair: str, trade: 'Trade', current_time: datetime,
                         current_rate: float, current_profit: float, **kwargs) -> float:
 
@@ -60,18 +74,13 @@ class SMAOffsetV2(IStrategy):
         if not self.dp:
             return dataframe
 
-        informative = self.dp.get_pair_dataframe(pair=metadata['pair'], timeframe=self.informative_timeframe)
-
-        informative = self.get_informative_indicators(informative.copy(), metadata)
-
-        dataframe = merge_informative_pair(dataframe, informative, self.timeframe, self.informative_timeframe,
-                                           ffill=True)
-        # don't overwrite the base dataframe's HLCV information
-        skip_columns = [(s + "_" + self.informative_timeframe) for s in
-                        ['date', 'open', 'high', 'low', 'close', 'volume']]
-        dataframe.rename(
-            columns=lambda s: s.replace("_{}".format(self.informative_timeframe), "") if (not s in skip_columns) else s,
-            inplace=True)
+        live = is_live(self.dp)
+        informative = get_informative_dataframe(self.dp, metadata['pair'], self.informative_timeframe,
+                                                self.get_informative_indicators,
+                                                self.informative_cache if live else None)
+        dataframe = merge_informative_columns(dataframe, informative, metadata['pair'], self.informative_columns,
+                                              self.timeframe, self.informative_timeframe,
+                                              self.informative_index_cache if live else None)
 
         # ---------------------------------------------------------------------------------
 
@@ -0,0 +1,94 @@
+from typing import Callable, List, Optional
+
+import numpy as np
+import pandas as pd
+from freqtrade.exchange import timeframe_to_minutes
+from pandas import DataFrame
+
+# Informative timeframe helpers shared by the strategies, they import it with
+#   sys.path.append(str(Path(__file__).parent))
+#   from informative_merge import ...
+# The caches are dicts per pair owned by the strategy, only worth passing where populate_indicators runs
+# again and again on the same pairs (live / dry-run), pass None otherwise.
+
+
+def is_live(dp) -> bool:
+    return dp is not None and dp.runmode.value in ('live', 'dry_run')
+
+
+def get_informative_index(dates, informative_dates, timeframe: str, timeframe_inf: str,
+                          state: Optional[dict] = None):
+    # Row of the informative dataframe to use on every base candle, -1 while there is none yet.
+    # Same alignment as merge_informative_pair: an informative candle is joined on the last base candle
+    # it contains (so only once it's closed) and forward filled from there.
+    # Returns (index, state). With the state of the previous call on the same pair, the rows still in both
+    # dataframes are taken from it and only the appended rows are aligned.
+    offset = np.timedelta64(timeframe_to_minutes(timeframe_inf) - timeframe_to_minutes(timeframe), 'm')
+    index = np.full(len(dates), -1)
+    start = 0
+
+    if state is not None and len(dates) and len(informative_dates):
+        known = np.searchsorted(state['dates'], dates[0])
+        kept = len(state['dates']) - known
+        known_informative = np.searchsorted(state['informative_dates'], informative_dates[0])
+        kept_informative = len(state['informative_dates']) - known_informative
+        if (0 < kept <= len(dates) and 0 < kept_informative <= len(informative_dates)
+                and state['dates'][known] == dates[0] and state['dates'][-1] == dates[kept - 1]
+                and state['informative_dates'][known_informative] == informative_dates[0]
+                and state['informative_dates'][-1] == informative_dates[kept_informative - 1]):
+            # Rows before the first candle an informative candle is joined on are forward filled from dropped
+            # candles (base or informative ones), they have nothing to join any more.
+            kept_index = state['index'][known:] - known_informative
+            joined = kept_index >= 0
+            joined[joined] = dates[:kept][joined] == informative_dates[kept_index[joined]] + offset
+            kept_index[:joined.argmax() if joined.any() else kept] = -1
+            # appended informative candles are joined from their merge date on, usually appended rows too
+            if kept_informative < len(informative_dates):
+                start = min(kept, np.searchsorted(dates, informative_dates[kept_informative] + offset))
+            else:
+                start = kept
+            index[:start] = kept_index[:start]
+
+    if start < len(dates):
+        first = np.searchsorted(informative_dates + offset, dates[start])
+        merge_dates = informative_dates[first:] + offset
+        positions = start + np.searchsorted(dates[start:], merge_dates)
+        matched = positions < len(dates)
+        matched[matched] = dates[positions[matched]] == merge_dates[matched]
+        index[positions[matched]] = first + np.flatnonzero(matched)
+        index[max(start - 1, 0):] = np.maximum.accumulate(index[max(start - 1, 0):])
+
+    return index, {'dates': dates, 'informative_dates': informative_dates, 'index': index}
+
+
+def get_informative_dataframe(dp, pair: str, timeframe_inf: str,
+                              populate: Callable[[DataFrame, dict], DataFrame],
+                              cache: Optional[dict] = None) -> DataFrame:
+    informative = dp.get_pair_dataframe(pair=pair, timeframe=timeframe_inf)
+    if cache is None:
+        return populate(informative.copy(), {'pair': pair})
+
+    # informative indicators only change with a new informative candle, reuse them on the ticks in between
+    last_candle = (len(informative), informative['date'].iloc[-1]) if len(informative) else None
+    cached = cache.get(pair)
+    if cached is None or last_candle is None or cached[0] != last_candle:
+        cached = (last_candle, populate(informative.copy(), {'pair': pair}))
+        cache[pair] = cached
+
+    return cached[1]
+
+
+def merge_informative_columns(dataframe: DataFrame, informative: DataFrame, pair: str, columns: List[str],
+                              timeframe: str, timeframe_inf: str, cache: Optional[dict] = None) -> DataFrame:
+    # Replaces merge_informative_pair(ffill=True) followed by dropping the informative suffix:
+    # the row alignment is kept per pair and the used columns are taken by index.
+    index, state = get_informative_index(dataframe['date'].values, informative['date'].values,
+                                         timeframe, timeframe_inf, None if cache is None else cache.get(pair))
+    if cache is not None:
+        cache[pair] = state
+
+    # reindexing by -1 gives the NaN rows of the left join, forward filled after the join like ffill=True does,
+    # so a NaN value is only filled from an informative candle that got joined
+    informative_columns = informative[columns].reset_index(drop=True).reindex(index).ffill()
+    informative_columns.index = dataframe.index
+    return pd.concat([dataframe, informative_columns], axis=1)